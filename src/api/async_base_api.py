@@ -0,0 +1,71 @@
+import asyncio
+import functools
+import requests
+from src.api.base_api import BaseAPI, MAX_RATE_LIMIT_RETRIES
+from src.api.http_session import get_http_executor
+from src.utils.logger import logger
+
+
+class AsyncBaseAPI(BaseAPI):
+    """Awaitable counterpart of BaseAPI for code running inside an asyncio event loop.
+
+    Rate-limit waits are awaited on the loop, and the HTTP round-trip runs on the
+    shared I/O executor over the same pooled keep-alive session as the sync client,
+    so a slow request never stalls other coroutines.
+    """
+
+    async def _asend(self, method, url, data=None, headers=None, params=None):
+        loop = asyncio.get_running_loop()
+        limiter = self.rate_limiter
+        for attempt in range(MAX_RATE_LIMIT_RETRIES + 1):
+            wait = limiter.reserve()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            response = await loop.run_in_executor(
+                get_http_executor(),
+                functools.partial(self._dispatch, method, url, data, headers, params),
+            )
+            if not self._should_retry(response, attempt):
+                break
+
+        response.raise_for_status()
+        return response.json()
+
+    async def _aget_request(self, url, auth_req=True, extra_headers=None, params=None):
+        """Async helper method to handle GET requests with error handling."""
+        try:
+            headers = self._get_header(auth_req, extra_headers, has_body=False)
+            return await self._asend("GET", url, headers=headers, params=params)
+        except requests.exceptions.RequestException as e:
+            logger.error(f"GET request failed: {e}")
+            return None
+
+    async def _apost_request(
+        self, url, data=None, auth_req=True, extra_headers=None, params=None
+    ):
+        """Async helper method to handle POST requests with error handling."""
+        try:
+            headers = self._get_header(
+                auth_req, extra_headers, has_body=(data is not None)
+            )
+            return await self._asend(
+                "POST", url, data=data, headers=headers, params=params
+            )
+        except requests.exceptions.RequestException as e:
+            logger.error(f"POST request failed: {e}")
+            return None
+
+    async def _apatch_request(
+        self, url, data=None, auth_req=True, extra_headers=None, params=None
+    ):
+        """Async helper method to handle PATCH requests with error handling."""
+        try:
+            headers = self._get_header(
+                auth_req, extra_headers, has_body=(data is not None)
+            )
+            return await self._asend(
+                "PATCH", url, data=data, headers=headers, params=params
+            )
+        except requests.exceptions.RequestException as e:
+            logger.error(f"PATCH request failed: {e}")
+            return None
@@ -1,10 +1,28 @@
+import threading
 import requests
+from src.api.http_session import get_http_session, get_timeout
+from src.api.rate_limiter import get_rate_limiter, retry_after_seconds
 from src.utils.logger import logger
 
+MAX_RATE_LIMIT_RETRIES = 3
+
 
 class BaseAPI:
     def __init__(self, agent_token: str = None) -> None:
         self.agent_token = agent_token
+        self.api_calls = 0  # HTTP round-trips made by this client, retries included
+        # Async requests are dispatched (and counted) on executor threads.
+        self._api_calls_lock = threading.Lock()
+
+    @property
+    def http(self):
+        """Shared keep-alive session; every BaseAPI subclass reuses the same pool."""
+        return get_http_session()
+
+    @property
+    def rate_limiter(self):
+        """Request budget shared by every client using the same agent token."""
+        return get_rate_limiter(self.agent_token)
 
     def _get_header(self, auth_req=True, extra_headers=None, has_body=False):
         """Generate request headers dynamically based on auth requirement and extra headers."""
@@ -24,13 +42,48 @@ class BaseAPI:
 
         return header
 
+    def _send(self, method, url, data=None, headers=None, params=None):
+        """Sends a request over the pooled session and returns the decoded JSON body.
+
+        Requests are paced by the agent's rate limiter; a 429 puts the whole agent on
+        hold for the advertised delay and the request is retried.
+        """
+        limiter = self.rate_limiter
+        for attempt in range(MAX_RATE_LIMIT_RETRIES + 1):
+            limiter.acquire()
+            response = self._dispatch(method, url, data, headers, params)
+            if not self._should_retry(response, attempt):
+                break
+
+        response.raise_for_status()
+        return response.json()
+
+    def _dispatch(self, method, url, data=None, headers=None, params=None):
+        """Performs a single HTTP round-trip and feeds the rate-limit headers back."""
+        with self._api_calls_lock:
+            self.api_calls += 1
+        response = self.http.request(
+            method,
+            url,
+            json=data,
+            headers=headers,
+            params=params,
+            timeout=get_timeout(),
+        )
+        self.rate_limiter.update_from_headers(response.headers)
+        return response
+
+    def _should_retry(self, response, attempt):
+        if response.status_code != 429 or attempt == MAX_RATE_LIMIT_RETRIES:
+            return False
+        self.rate_limiter.penalize(retry_after_seconds(response))
+        return True
+
     def _get_request(self, url, auth_req=True, extra_headers=None, params=None):
         """Helper method to handle GET requests with error handling."""
         try:
             headers = self._get_header(auth_req, extra_headers, has_body=False)
-            response = requests.get(url, headers=headers, params=params)
-            response.raise_for_status()
-            return response.json()
+            return self._send("GET", url, headers=headers, params=params)
         except requests.exceptions.RequestException as e:
             logger.error(f"GET request failed: {e}")
             return None
@@ -43,9 +96,7 @@ class BaseAPI:
             headers = self._get_header(
                 auth_req, extra_headers, has_body=(data is not None)
             )
-            response = requests.post(url, json=data, headers=headers, params=params)
-            response.raise_for_status()
-            return response.json()
+            return self._send("POST", url, data=data, headers=headers, params=params)
         except requests.exceptions.RequestException as e:
             logger.error(f"POST request failed: {e}")
             return None
@@ -58,9 +109,7 @@ class BaseAPI:
             headers = self._get_header(
                 auth_req, extra_headers, has_body=(data is not None)
             )
-            response = requests.patch(url, json=data, headers=headers, params=params)
-            response.raise_for_status()
-            return response.json()
+            return self._send("PATCH", url, data=data, headers=headers, params=params)
         except requests.exceptions.RequestException as e:
             logger.error(f"PATCH request failed: {e}")
             return None
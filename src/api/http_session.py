@@ -0,0 +1,181 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from src.utils.logger import logger
+
+DEFAULT_POOL_SIZE = 20
+DEFAULT_POOL_CONNECTIONS = 4  # distinct hosts kept in the pool manager
+DEFAULT_CONNECT_TIMEOUT = 5.0
+DEFAULT_READ_TIMEOUT = 30.0
+
+
+class ConnectionStats:
+    """Thread-safe counters for requests sent and TCP connections opened."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.new_connections = 0
+
+    def record_request(self):
+        with self._lock:
+            self.requests += 1
+
+    def record_new_connection(self):
+        with self._lock:
+            self.new_connections += 1
+
+    @property
+    def reused_connections(self):
+        """Requests that were served over an already open keep-alive connection."""
+        with self._lock:
+            return max(self.requests - self.new_connections, 0)
+
+    def snapshot(self):
+        with self._lock:
+            reused = max(self.requests - self.new_connections, 0)
+            return {
+                "requests": self.requests,
+                "new_connections": self.new_connections,
+                "reused_connections": reused,
+                "reuse_ratio": reused / self.requests if self.requests else 0.0,
+            }
+
+    def reset(self):
+        with self._lock:
+            self.requests = 0
+            self.new_connections = 0
+
+
+connection_stats = ConnectionStats()
+
+
+class _CountingHTTPConnectionPool(HTTPConnectionPool):
+    def _new_conn(self):
+        connection_stats.record_new_connection()
+        return super()._new_conn()
+
+
+class _CountingHTTPSConnectionPool(HTTPSConnectionPool):
+    def _new_conn(self):
+        connection_stats.record_new_connection()
+        return super()._new_conn()
+
+
+class PooledHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter that keeps connections alive and counts how often they are reused."""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _CountingHTTPConnectionPool,
+            "https": _CountingHTTPSConnectionPool,
+        }
+
+    def send(self, request, **kwargs):
+        connection_stats.record_request()
+        return super().send(request, **kwargs)
+
+
+_lock = threading.Lock()
+_session = None
+_session_pid = None
+_executor = None
+_settings = {
+    "pool_size": DEFAULT_POOL_SIZE,
+    "pool_connections": DEFAULT_POOL_CONNECTIONS,
+    "timeout": (DEFAULT_CONNECT_TIMEOUT, DEFAULT_READ_TIMEOUT),
+}
+
+
+def _build_session():
+    session = requests.Session()
+    adapter = PooledHTTPAdapter(
+        pool_connections=_settings["pool_connections"],
+        pool_maxsize=_settings["pool_size"],
+        pool_block=True,  # wait for a free connection instead of opening throwaway ones
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    logger.debug(
+        f"Created pooled HTTP session (pool_size={_settings['pool_size']}, "
+        f"timeout={_settings['timeout']})"
+    )
+    return session
+
+
+def get_http_session():
+    """Returns the process-wide pooled session, creating it on first use (or after a fork)."""
+    global _session, _session_pid
+    pid = os.getpid()
+    if _session is not None and _session_pid == pid:
+        return _session
+
+    with _lock:
+        if _session is None or _session_pid != pid:
+            _session = _build_session()
+            _session_pid = pid
+        return _session
+
+
+def get_http_executor():
+    """Thread pool used by the async clients to run blocking I/O off the event loop.
+
+    It is sized to the connection pool so every worker can hold a keep-alive connection.
+    """
+    global _executor
+    if _executor is None:
+        with _lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=_settings["pool_size"], thread_name_prefix="http"
+                )
+    return _executor
+
+
+def get_timeout():
+    """Returns the (connect, read) timeout tuple used for every API call."""
+    return _settings["timeout"]
+
+
+def configure_http_session(
+    pool_size=None, pool_connections=None, connect_timeout=None, read_timeout=None
+):
+    """Changes pool/timeout settings and rebuilds the shared session with them."""
+    global _session, _session_pid
+    with _lock:
+        if pool_size is not None:
+            _settings["pool_size"] = pool_size
+        if pool_connections is not None:
+            _settings["pool_connections"] = pool_connections
+        connect, read = _settings["timeout"]
+        _settings["timeout"] = (
+            connect_timeout if connect_timeout is not None else connect,
+            read_timeout if read_timeout is not None else read,
+        )
+
+        if _session is not None:
+            _session.close()
+        _session = _build_session()
+        _session_pid = os.getpid()
+        return _session
+
+
+def close_http_session():
+    """Closes all pooled connections; the next call to get_http_session() starts fresh."""
+    global _session, _session_pid, _executor
+    with _lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True)
+        if _session is not None:
+            _session.close()
+        _session = None
+        _session_pid = None
+        _executor = None
+
+
+def get_connection_stats():
+    return connection_stats.snapshot()
@@ -0,0 +1,159 @@
+import threading
+import time
+from datetime import datetime, timezone
+from src.utils.logger import logger
+
+# SpaceTraders allows 2 requests/second per agent plus a burst pool of 30 requests
+# that refills over 60 seconds.
+DEFAULT_PER_SECOND = 2
+DEFAULT_BURST = 30
+DEFAULT_BURST_WINDOW = 60
+ANONYMOUS_KEY = "__anonymous__"
+
+
+class TokenBucket:
+    """Classic token bucket; the balance may go negative to queue reservations."""
+
+    def __init__(self, rate: float, capacity: float) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def refill(self, now):
+        elapsed = now - self.updated
+        if elapsed > 0:
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+            self.updated = now
+
+    def take(self):
+        """Takes one token and returns the seconds until it is actually available."""
+        self.tokens -= 1
+        return -self.tokens / self.rate if self.tokens < 0 else 0.0
+
+
+class RateLimiter:
+    """Steady-rate bucket backed by a burst pool, shared by every client of one agent."""
+
+    def __init__(
+        self,
+        per_second=DEFAULT_PER_SECOND,
+        burst=DEFAULT_BURST,
+        burst_window=DEFAULT_BURST_WINDOW,
+    ) -> None:
+        self._lock = threading.Lock()
+        self.steady = TokenBucket(per_second, per_second)
+        self.burst = TokenBucket(burst / burst_window, burst)
+        self.blocked_until = 0.0
+        self.throttled = 0  # number of 429 responses seen
+
+    def reserve(self):
+        """Reserves a request slot and returns how long the caller must wait before sending."""
+        with self._lock:
+            now = time.monotonic()
+            self.steady.refill(now)
+            self.burst.refill(now)
+            blocked = max(self.blocked_until - now, 0.0)
+
+            if not blocked:
+                if self.steady.tokens >= 1:
+                    self.steady.take()
+                    return 0.0
+                if self.burst.tokens >= 1:
+                    self.burst.take()
+                    return 0.0
+
+            # Queue behind earlier reservations at the steady rate; penalize() put
+            # the bucket in debt for the block, so waiters are spread out after it
+            # instead of all firing when it ends.
+            return max(self.steady.take(), blocked)
+
+    def acquire(self):
+        """Blocks the calling thread until a request may be sent."""
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def penalize(self, retry_after):
+        """Stops all traffic for retry_after seconds after the server returned 429."""
+        with self._lock:
+            now = time.monotonic()
+            self.throttled += 1
+            self.blocked_until = max(self.blocked_until, now + retry_after)
+            self.steady.refill(now)
+            self.burst.refill(now)
+            debt = (self.blocked_until - now) * self.steady.rate
+            self.steady.tokens = min(self.steady.tokens, -debt)
+            self.burst.tokens = 0.0
+        logger.warning(f"Rate limited by server, backing off for {retry_after:.2f}s")
+
+    def update_from_headers(self, headers):
+        """Aligns the local budget with the x-ratelimit-* headers returned by the API."""
+        if not headers:
+            return
+
+        per_second = _as_float(headers.get("x-ratelimit-limit-per-second"))
+        burst = _as_float(headers.get("x-ratelimit-limit-burst"))
+        burst_window = _as_float(headers.get("x-ratelimit-burst-time"))
+        remaining = _as_float(headers.get("x-ratelimit-remaining"))
+        reset = _seconds_until(headers.get("x-ratelimit-reset"))
+
+        with self._lock:
+            if per_second and per_second != self.steady.rate:
+                self.steady.rate = per_second
+                self.steady.capacity = per_second
+            if burst and burst_window:
+                self.burst.capacity = burst
+                self.burst.rate = burst / burst_window
+            if remaining is not None:
+                self.burst.tokens = min(self.burst.tokens, remaining)
+                if remaining <= 0 and reset:
+                    self.burst.updated = time.monotonic() + reset
+
+
+def retry_after_seconds(response, default=1.0):
+    """Reads the back-off delay from Retry-After or the 429 error body."""
+    value = _as_float(response.headers.get("Retry-After"))
+    if value is None:
+        try:
+            body = response.json()
+        except ValueError:
+            body = None
+        error = body.get("error") if isinstance(body, dict) else None
+        data = error.get("data") if isinstance(error, dict) else None
+        value = _as_float(data.get("retryAfter")) if isinstance(data, dict) else None
+    if value is None:
+        value = _seconds_until(response.headers.get("x-ratelimit-reset"))
+    return value if value and value > 0 else default
+
+
+def _as_float(value):
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _seconds_until(timestamp):
+    if not timestamp:
+        return None
+    try:
+        reset_at = datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return max((reset_at - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+_registry_lock = threading.Lock()
+_limiters = {}
+
+
+def get_rate_limiter(agent_token=None):
+    """Returns the limiter for an agent token; all Player/SpaceShip objects of that agent share it."""
+    key = agent_token or ANONYMOUS_KEY
+    limiter = _limiters.get(key)
+    if limiter is None:
+        with _registry_lock:
+            limiter = _limiters.setdefault(key, RateLimiter())
+    return limiter
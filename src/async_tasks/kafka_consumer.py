@@ -1,43 +1,240 @@
 import json
 import asyncio
-from confluent_kafka import Consumer, KafkaError
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from confluent_kafka import Consumer, KafkaError, KafkaException, TopicPartition
 from src.events.handlers import handle_travel_event
 from src.utils.logger import logger
 
-consumer = Consumer(
-    {
-        "bootstrap.servers": "localhost:9093",
-        "group.id": "game-event-consumer",
-        "auto.offset.reset": "earliest",
-    }
-)
+CONSUMER_CONFIG = {
+    "bootstrap.servers": "localhost:9093",
+    "group.id": "game-event-consumer",
+    "auto.offset.reset": "earliest",
+    # Offsets are committed by EventConsumer once their handlers have finished.
+    "enable.auto.commit": False,
+}
+TOPICS = ["game-events"]
+HANDLERS = {"start_trip": handle_travel_event}
+
+MAX_IN_FLIGHT = 256
+RESUME_AT = MAX_IN_FLIGHT // 2  # resume fetching once in-flight drops to this
+POLL_TIMEOUT = 1.0
+DRAIN_TIMEOUT = 30
+
+
+class PartitionOffsets:
+    """Tracks in-flight offsets per partition and the next offset that is safe to
+    commit: one past the end of the contiguous run of completed messages, so a slow
+    handler holds back its partition instead of being skipped on restart.
+
+    Each assignment of a partition gets a new generation; completions carry the
+    generation they were tracked under, so a handler outliving a revoke cannot mark
+    offsets of the next assignment as done."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._pending = {}  # (topic, partition) -> deque of offsets in fetch order
+        self._done = {}  # (topic, partition) -> completed offsets not yet contiguous
+        self._committable = {}  # (topic, partition) -> offset to commit
+        self._generation = {}  # (topic, partition) -> bumped on every forget
+
+    def track(self, topic, partition, offset):
+        """Records a fetched offset; returns the generation to pass to complete()."""
+        key = (topic, partition)
+        with self._lock:
+            self._pending.setdefault(key, deque()).append(offset)
+            self._done.setdefault(key, set())
+            return self._generation.get(key, 0)
+
+    def complete(self, topic, partition, offset, generation):
+        key = (topic, partition)
+        with self._lock:
+            pending = self._pending.get(key)
+            # Revoked meanwhile, possibly reassigned since, or already committed.
+            if (
+                pending is None
+                or generation != self._generation.get(key, 0)
+                or not pending
+                or offset < pending[0]
+            ):
+                return
+            done = self._done[key]
+            done.add(offset)
+            while pending and pending[0] in done:
+                done.discard(pending[0])
+                self._committable[key] = pending.popleft() + 1
+
+    def take_committable(self, partitions=None):
+        """TopicPartitions to commit (all, or only `partitions`), cleared once taken."""
+        with self._lock:
+            keys = list(self._committable) if partitions is None else partitions
+            return [
+                TopicPartition(*key, self._committable.pop(key))
+                for key in keys
+                if key in self._committable
+            ]
+
+    def forget(self, partitions):
+        with self._lock:
+            for key in partitions:
+                self._pending.pop(key, None)
+                self._done.pop(key, None)
+                self._committable.pop(key, None)
+                self._generation[key] = self._generation.get(key, 0) + 1
+
+
+class EventConsumer:
+    """Consumes game events with bounded concurrency and at-least-once delivery.
+
+    Every consumer call runs on one dedicated thread, so polling never blocks the
+    event loop and librdkafka is never called concurrently. At most `max_in_flight`
+    handlers run at once; once that many are in flight the assigned partitions are
+    paused (the consumer keeps polling so it stays in the group) and resumed when
+    the backlog drops to `resume_at`. Offsets are committed only up to the first
+    unfinished message of each partition.
+    """
+
+    def __init__(
+        self, topics=TOPICS, max_in_flight=MAX_IN_FLIGHT, resume_at=RESUME_AT
+    ) -> None:
+        self.topics = topics
+        self.max_in_flight = max_in_flight
+        self.resume_at = resume_at
+        self.consumer = Consumer(CONSUMER_CONFIG)
+        self.offsets = PartitionOffsets()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="kafka")
+        self._tasks = set()
+        self._semaphore = None
+        self._paused = False
+        self._running = False
+
+    async def _call(self, method, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, lambda: method(*args, **kwargs)
+        )
+
+    # Rebalance callbacks run on the consumer thread, inside consume().
+    def _on_assign(self, consumer, partitions):
+        logger.info(f"Assigned {len(partitions)} partitions.")
+        if self._paused:
+            consumer.pause(partitions)
+
+    def _on_revoke(self, consumer, partitions):
+        keys = [(p.topic, p.partition) for p in partitions]
+        offsets = self.offsets.take_committable(keys)
+        if offsets:
+            try:
+                consumer.commit(offsets=offsets, asynchronous=False)
+            except KafkaException as e:
+                logger.error(f"Commit on revoke failed: {e}")
+        # Handlers still running for these partitions finish, but their offsets are
+        # left to the new owner, which redelivers them.
+        self.offsets.forget(keys)
+        logger.info(f"Revoked {len(partitions)} partitions.")
+
+    def _on_lost(self, consumer, partitions):
+        self.offsets.forget([(p.topic, p.partition) for p in partitions])
+        logger.warning(f"Lost {len(partitions)} partitions.")
+
+    async def run(self):
+        """Runs until stop() is called or the task is cancelled, then drains."""
+        self._semaphore = asyncio.Semaphore(self.max_in_flight)
+        await self._call(
+            self.consumer.subscribe,
+            self.topics,
+            on_assign=self._on_assign,
+            on_revoke=self._on_revoke,
+            on_lost=self._on_lost,
+        )
+        logger.info("kafka consumer started waiting for events")
+
+        self._running = True
+        try:
+            while self._running:
+                await self._apply_backpressure()
+                free = max(self.max_in_flight - len(self._tasks), 1)
+                messages = await self._call(self.consumer.consume, free, POLL_TIMEOUT)
+                for msg in messages:
+                    self._dispatch(msg)
+                await self._commit()
+        finally:
+            await self._shutdown()
+
+    def stop(self):
+        self._running = False
+
+    async def _apply_backpressure(self):
+        in_flight = len(self._tasks)
+        if not self._paused and in_flight >= self.max_in_flight:
+            self._paused = True
+            assignment = await self._call(self.consumer.assignment)
+            await self._call(self.consumer.pause, assignment)
+            logger.info(f"{in_flight} events in flight, pausing consumption.")
+        elif self._paused and in_flight <= self.resume_at:
+            self._paused = False
+            assignment = await self._call(self.consumer.assignment)
+            await self._call(self.consumer.resume, assignment)
+            logger.info(f"{in_flight} events in flight, resuming consumption.")
+
+    def _dispatch(self, msg):
+        error = msg.error()
+        if error:
+            if error.code() == KafkaError._PARTITION_EOF:
+                return
+            if error.fatal():
+                raise KafkaException(error)
+            logger.error(f"Kafka error: {error}")
+            return
+        generation = self.offsets.track(msg.topic(), msg.partition(), msg.offset())
+        task = asyncio.create_task(self._handle(msg, generation))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _handle(self, msg, generation):
+        async with self._semaphore:
+            try:
+                event = json.loads(msg.value().decode("utf-8"))
+                event_type = event.get("event_type")
+                handler = HANDLERS.get(event_type)
+                if handler is None:
+                    logger.warning(f"Unknown event type: {event_type}")
+                else:
+                    await handler(event)
+            except Exception as e:
+                # A failing event is logged and skipped so it cannot stall its
+                # partition; retries belong in the handler.
+                logger.error(
+                    f"Event {msg.topic()}[{msg.partition()}]@{msg.offset()} "
+                    f"failed: {e}"
+                )
+        # Not reached when cancelled, so an interrupted event is redelivered.
+        self.offsets.complete(msg.topic(), msg.partition(), msg.offset(), generation)
+
+    async def _commit(self, asynchronous=True):
+        offsets = self.offsets.take_committable()
+        if not offsets:
+            return
+        try:
+            await self._call(
+                self.consumer.commit, offsets=offsets, asynchronous=asynchronous
+            )
+        except KafkaException as e:
+            logger.error(f"Offset commit failed: {e}")
+
+    async def _shutdown(self):
+        if self._tasks:
+            logger.info(f"Draining {len(self._tasks)} in-flight events...")
+            _, pending = await asyncio.wait(self._tasks, timeout=DRAIN_TIMEOUT)
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+        await self._commit(asynchronous=False)
+        await self._call(self.consumer.close)
+        self._executor.shutdown(wait=False)
+        logger.info("kafka consumer stopped.")
 
 
 async def consume_event():
-    consumer.subscribe(["game-events"])
-    logger.info("kafka consumer started waiting for events")
-
-    loop = asyncio.get_event_loop()
-
-    while True:
-        msg = consumer.poll(1.0)
-        if msg is None:
-            await asyncio.sleep(0.1)
-            continue
-
-        if msg.error():
-            if msg.error().code() == KafkaError._PARTITION_EOF:
-                continue
-            else:
-                print(f"Kafka error: {msg.error()}")
-                break
-        event = json.loads(msg.value().decode("utf-8"))
-        event_type = event.get("event_type")
-
-        if event_type == "start_trip":
-            # Dispatch async handler concurrently
-            loop.create_task(handle_travel_event(event))
-        else:
-            print(f"Unknown event type: {event_type}")
-
-    consumer.close()
+    await EventConsumer().run()
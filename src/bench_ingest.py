@@ -0,0 +1,77 @@
+import argparse
+import random
+import time
+from sqlalchemy.orm import Session
+from src.db.db import engine
+from src.db.bulk import store_systems_bulk
+from src.objects.market import Market
+
+
+def synthetic_systems(n_systems, waypoints_per_system, seed=0):
+    """Builds /systems-shaped payloads with orbiting moons, prefixed BENCH- to stay apart."""
+    rng = random.Random(seed)
+    systems = []
+    for i in range(n_systems):
+        symbol = f"BENCH-{seed}-{i}"
+        waypoints = []
+        for j in range(waypoints_per_system):
+            wp = {
+                "symbol": f"{symbol}-W{j}",
+                "type": "PLANET" if j % 3 == 0 else "MOON",
+                "x": rng.randint(-800, 800),
+                "y": rng.randint(-800, 800),
+            }
+            if j % 3:
+                wp["orbits"] = f"{symbol}-W{j - j % 3}"
+            waypoints.append(wp)
+        systems.append(
+            {
+                "symbol": symbol,
+                "sectorSymbol": "BENCH",
+                "constellation": "BENCH",
+                "name": symbol,
+                "x": rng.randint(-50000, 50000),
+                "y": rng.randint(-50000, 50000),
+                "waypoints": waypoints,
+            }
+        )
+    return systems
+
+
+def orm_store(session, systems):
+    market = Market(player=None)
+    system_map = market.insert_systems(systems, session)
+    waypoint_map = market.insert_waypoints(systems, session, system_map)
+    market.link_parent_waypoints(systems, session, waypoint_map)
+
+
+def timed(label, store, systems):
+    """Runs one ingestion path inside a transaction that is rolled back afterwards."""
+    rows = len(systems) + sum(len(s["waypoints"]) for s in systems)
+    with engine.connect() as conn:
+        outer = conn.begin()
+        session = Session(bind=conn, join_transaction_mode="create_savepoint")
+        try:
+            started = time.perf_counter()
+            store(session, systems)
+            session.flush()
+            elapsed = time.perf_counter() - started
+        finally:
+            session.close()
+            outer.rollback()
+    print(f"{label:<6} {rows:>7} rows  {elapsed:8.3f}s  {rows / elapsed:10.0f} rows/s")
+    return rows / elapsed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Compare ORM vs bulk universe ingestion."
+    )
+    parser.add_argument("--systems", type=int, default=200)
+    parser.add_argument("--waypoints", type=int, default=12)
+    args = parser.parse_args()
+
+    systems = synthetic_systems(args.systems, args.waypoints)
+    orm_rate = timed("orm", orm_store, systems)
+    bulk_rate = timed("bulk", store_systems_bulk, systems)
+    print(f"bulk speed-up: {bulk_rate / orm_rate:.1f}x")
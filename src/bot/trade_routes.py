@@ -0,0 +1,199 @@
+import threading
+import numpy as np
+import pandas as pd
+from geoalchemy2.functions import ST_X, ST_Y
+from src.db.db_session import get_session
+from src.db.models import MarketTradeGoods, System, Waypoint
+from src.objects.navigation import fuel_cost, travel_time
+from src.utils.logger import logger
+
+SNAPSHOT_COLUMNS = [
+    "waypoint_id",
+    "waypoint_symbol",
+    "system_symbol",
+    "x",
+    "y",
+    "product_symbol",
+    "purchase_price",
+    "sell_price",
+    "trade_volume",
+    "supply",
+    "last_updated",
+]
+SORT_KEYS = ("profit_per_unit", "profit_per_load", "profit_per_second")
+
+
+def load_market_snapshot(waypoint_ids=None):
+    """Latest price per (waypoint, good) across all ships, as a DataFrame."""
+    with get_session() as session:
+        query = (
+            session.query(
+                MarketTradeGoods.waypoint_id,
+                Waypoint.waypoint_symbol,
+                System.symbol,
+                ST_X(Waypoint.waypoint_location),
+                ST_Y(Waypoint.waypoint_location),
+                MarketTradeGoods.product_symbol,
+                MarketTradeGoods.purchase_price,
+                MarketTradeGoods.sell_price,
+                MarketTradeGoods.trade_volume,
+                MarketTradeGoods.supply,
+                MarketTradeGoods.last_updated,
+            )
+            .join(Waypoint, MarketTradeGoods.waypoint_id == Waypoint.id)
+            .join(System, Waypoint.system_id == System.id)
+            .distinct(MarketTradeGoods.waypoint_id, MarketTradeGoods.product_symbol)
+            .order_by(
+                MarketTradeGoods.waypoint_id,
+                MarketTradeGoods.product_symbol,
+                MarketTradeGoods.last_updated.desc(),
+            )
+        )
+        if waypoint_ids is not None:
+            query = query.filter(MarketTradeGoods.waypoint_id.in_(list(waypoint_ids)))
+        rows = query.all()
+    return pd.DataFrame(rows, columns=SNAPSHOT_COLUMNS)
+
+
+def pair_markets(buys, sells):
+    """Joins buy-side rows with sell-side rows of the same good in the same system.
+
+    Waypoint coordinates are local to a system, so only intra-system pairs get a
+    travel distance; profit is what one unit earns bought at A and sold at B.
+    """
+    pairs = buys.merge(
+        sells,
+        on=["system_symbol", "product_symbol"],
+        suffixes=("_buy", "_sell"),
+    )
+    pairs = pairs[pairs["waypoint_id_buy"] != pairs["waypoint_id_sell"]]
+    profit = pairs["sell_price_sell"] - pairs["purchase_price_buy"]
+    pairs = pairs[profit > 0]
+    return pd.DataFrame(
+        {
+            "product_symbol": pairs["product_symbol"],
+            "system_symbol": pairs["system_symbol"],
+            "buy_waypoint_id": pairs["waypoint_id_buy"],
+            "buy_waypoint": pairs["waypoint_symbol_buy"],
+            "sell_waypoint_id": pairs["waypoint_id_sell"],
+            "sell_waypoint": pairs["waypoint_symbol_sell"],
+            "purchase_price": pairs["purchase_price_buy"],
+            "sell_price": pairs["sell_price_sell"],
+            "profit_per_unit": pairs["sell_price_sell"] - pairs["purchase_price_buy"],
+            "trade_volume": np.minimum(
+                pairs["trade_volume_buy"], pairs["trade_volume_sell"]
+            ),
+            "distance": np.hypot(
+                pairs["x_buy"] - pairs["x_sell"], pairs["y_buy"] - pairs["y_sell"]
+            ),
+        }
+    ).reset_index(drop=True)
+
+
+class TradeRouteEngine:
+    """Buy-here/sell-there opportunities over the latest market snapshot.
+
+    Pairs are computed with one vectorized join; refreshing a market only re-joins
+    the rows of that market against the rest of the snapshot. Ship-dependent
+    metrics (per load, per second) are derived at query time.
+    """
+
+    def __init__(self, snapshot=None) -> None:
+        self.snapshot = snapshot if snapshot is not None else load_market_snapshot()
+        self.routes = pair_markets(self.snapshot, self.snapshot)
+        logger.info(
+            f"Trade routes computed: {len(self.routes)} profitable pairs over "
+            f"{self.snapshot['waypoint_id'].nunique()} markets."
+        )
+
+    def refresh_markets(self, waypoint_ids, snapshot=None):
+        """Re-evaluates pairs touching the given markets from their latest rows."""
+        waypoint_ids = list(waypoint_ids)
+        if not waypoint_ids:
+            return
+        fresh = snapshot if snapshot is not None else load_market_snapshot(waypoint_ids)
+        rest = self.snapshot[~self.snapshot["waypoint_id"].isin(waypoint_ids)]
+        self.snapshot = pd.concat([rest, fresh], ignore_index=True)
+
+        stale = self.routes["buy_waypoint_id"].isin(waypoint_ids) | self.routes[
+            "sell_waypoint_id"
+        ].isin(waypoint_ids)
+        self.routes = pd.concat(
+            [
+                self.routes[~stale],
+                pair_markets(fresh, self.snapshot),
+                pair_markets(rest, fresh),
+            ],
+            ignore_index=True,
+        )
+
+    def best_routes(
+        self,
+        cargo_capacity,
+        engine_speed,
+        flight_mode="CRUISE",
+        sort_by="profit_per_second",
+        system_symbol=None,
+        per_good=True,
+        limit=20,
+    ):
+        """Ranks opportunities for a ship; per_good keeps only the best pair per good."""
+        if sort_by not in SORT_KEYS:
+            raise ValueError(f"Unknown sort key {sort_by}; use one of {SORT_KEYS}.")
+        routes = self.routes
+        if system_symbol is not None:
+            routes = routes[routes["system_symbol"] == system_symbol]
+        routes = routes.assign(
+            fuel=fuel_cost(routes["distance"].to_numpy(), flight_mode),
+            travel_seconds=travel_time(
+                routes["distance"].to_numpy(), engine_speed, flight_mode
+            ),
+            profit_per_load=routes["profit_per_unit"] * cargo_capacity,
+        )
+        routes = routes.assign(
+            profit_per_second=routes["profit_per_load"]
+            / routes["travel_seconds"].clip(lower=1)
+        ).sort_values(sort_by, ascending=False)
+        if per_good:
+            routes = routes.drop_duplicates("product_symbol")
+        return routes.head(limit).reset_index(drop=True)
+
+    def trade_volumes(self, waypoint_symbol):
+        """{product: trade volume} last seen at a market; empty if it is unknown."""
+        rows = self.snapshot[self.snapshot["waypoint_symbol"] == waypoint_symbol]
+        return dict(zip(rows["product_symbol"], rows["trade_volume"].fillna(0).astype(int)))
+
+    def best_sell_market(self, system_symbol, inventory, exclude=()):
+        """Market of a system paying the most for `inventory` ({symbol: units}), or
+        None if no known market there buys any of it."""
+        snapshot = self.snapshot
+        rows = snapshot[
+            (snapshot["system_symbol"] == system_symbol)
+            & snapshot["product_symbol"].isin(list(inventory))
+            & ~snapshot["waypoint_symbol"].isin(list(exclude))
+        ]
+        if rows.empty:
+            return None
+        revenue = rows["sell_price"] * rows["product_symbol"].map(inventory)
+        return revenue.groupby(rows["waypoint_symbol"]).sum().idxmax()
+
+
+_lock = threading.Lock()
+_engine = None
+
+
+def get_trade_route_engine():
+    """Returns the process-wide engine, computing all pairs on first use."""
+    global _engine
+    if _engine is None:
+        with _lock:
+            if _engine is None:
+                _engine = TradeRouteEngine()
+    return _engine
+
+
+def markets_refreshed(waypoint_ids):
+    """Incrementally updates the engine after markets were written; no-op if not loaded."""
+    with _lock:
+        if _engine is not None:
+            _engine.refresh_markets(set(waypoint_ids))
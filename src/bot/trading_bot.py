@@ -0,0 +1,360 @@
+import asyncio
+import heapq
+import itertools
+import time
+from datetime import datetime, timezone
+from src.bot.trade_routes import get_trade_route_engine
+from src.objects.ship import SpaceShip
+from src.utils.logger import logger
+
+IDLE_RECHECK_SECONDS = 300
+ERROR_BACKOFF_SECONDS = 30
+MINING_ROLES = {"EXCAVATOR"}
+ROUTE_CANDIDATES = 20
+
+
+def seconds_until(timestamp):
+    """Seconds from now until an API timestamp, never negative."""
+    when = datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
+    return max((when - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+class ShipAgent:
+    """Task state of one ship. step() performs the next action and returns the delay
+    (seconds) until the ship needs attention again."""
+
+    def __init__(self, scheduler, ship, fuel, cargo) -> None:
+        self.scheduler = scheduler
+        self.ship = ship
+        self.fuel = fuel or {"current": 0, "capacity": 0}
+        self.cargo_capacity = (cargo or {}).get("capacity", 0)
+        self.inventory = {
+            item["symbol"]: item["units"]
+            for item in (cargo or {}).get("inventory") or []
+        }
+        self.stage = "IDLE"
+        self.route = None
+        self.mine_waypoint = None
+        self.unload_waypoint = None
+        self.unsellable = set()  # markets that refused this ship's cargo
+
+    @property
+    def cargo_units(self):
+        return sum(self.inventory.values())
+
+    @property
+    def hold_full(self):
+        return 0 < self.cargo_capacity <= self.cargo_units
+
+    async def step(self):
+        handler = getattr(self, f"_stage_{self.stage.lower()}")
+        return await handler()
+
+    # Task selection
+    async def _stage_idle(self):
+        self._release()
+        if self.ship.role in MINING_ROLES:
+            if self.hold_full:
+                self.stage = "TO_UNLOAD"
+            elif self.mine_waypoint not in (None, self.ship.waypointSymbol):
+                self.stage = "TO_MINE"
+            else:
+                self.stage = "MINE"
+            return 0
+        route = await self.scheduler.claim_route(self)
+        if route is None:
+            logger.info(f"{self.ship.shipSymbol}: no profitable route, idling.")
+            return IDLE_RECHECK_SECONDS
+        self.route = route
+        self.stage = "TO_BUY"
+        logger.info(
+            f"{self.ship.shipSymbol}: {route['product_symbol']} "
+            f"{route['buy_waypoint']} -> {route['sell_waypoint']} "
+            f"({route['profit_per_unit']}/unit)"
+        )
+        return 0
+
+    # Trading
+    async def _stage_to_buy(self):
+        return await self._travel(self.route["buy_waypoint"], next_stage="BUY")
+
+    async def _stage_buy(self):
+        await self.ship.dock_async()
+        product = self.route["product_symbol"]
+        while self.cargo_units < self.cargo_capacity:
+            units = min(
+                self.cargo_capacity - self.cargo_units, int(self.route["trade_volume"])
+            )
+            if not self._apply(await self.ship.purchase_cargo_async(product, units)):
+                break
+        await self.ship.orbit_async()
+        if not self.inventory.get(product):
+            logger.warning(f"{self.ship.shipSymbol}: could not buy {product}.")
+            self.stage = "IDLE"
+            return ERROR_BACKOFF_SECONDS
+        self.stage = "TO_SELL"
+        return 0
+
+    async def _stage_to_sell(self):
+        return await self._travel(self.route["sell_waypoint"], next_stage="SELL")
+
+    async def _stage_sell(self):
+        if not await self._sell_all():
+            logger.warning(
+                f"{self.ship.shipSymbol}: nothing sold at {self.ship.waypointSymbol}."
+            )
+        self.stage = "IDLE"
+        await self._finish_task()
+        return 0
+
+    # Mining
+    async def _stage_mine(self):
+        self.mine_waypoint = self.mine_waypoint or self.ship.waypointSymbol
+        response = await self.ship.extract_async()
+        if not self._apply(response):
+            self.stage = "IDLE"
+            return ERROR_BACKOFF_SECONDS
+        if self.hold_full:
+            self.stage = "TO_UNLOAD"
+        cooldown = response["data"].get("cooldown", {})
+        return cooldown.get("remainingSeconds", 0)
+
+    async def _stage_to_unload(self):
+        # Extraction sites rarely have a market, so fly to the one paying most.
+        if self.unload_waypoint is None:
+            engine = await asyncio.to_thread(get_trade_route_engine)
+            self.unload_waypoint = engine.best_sell_market(
+                self.ship.systemSymbol, self.inventory, exclude=self.unsellable
+            )
+        if self.unload_waypoint is None:
+            logger.warning(
+                f"{self.ship.shipSymbol}: no known market in "
+                f"{self.ship.systemSymbol} buys its cargo."
+            )
+            return IDLE_RECHECK_SECONDS
+        return await self._travel(self.unload_waypoint, next_stage="UNLOAD")
+
+    async def _stage_unload(self):
+        market, self.unload_waypoint = self.unload_waypoint, None
+        if not await self._sell_all():
+            # Leave the mining task rather than extracting into a full hold again.
+            logger.warning(
+                f"{self.ship.shipSymbol}: {market} bought none of its cargo."
+            )
+            self.unsellable.add(market)
+            self.mine_waypoint = None
+            self.stage = "IDLE"
+            return IDLE_RECHECK_SECONDS
+        self.unsellable.clear()
+        await self._finish_task()
+        self.stage = "TO_MINE"
+        return 0
+
+    async def _stage_to_mine(self):
+        if self.mine_waypoint is None:
+            self.stage = "MINE"
+            return 0
+        return await self._travel(self.mine_waypoint, next_stage="MINE")
+
+    # Helpers
+    async def _travel(self, destination, next_stage):
+        """Flies the next leg towards destination; advances the stage on arrival."""
+        if self.ship.waypointSymbol == destination:
+            self.stage = next_stage
+            return 0
+
+        route = await asyncio.to_thread(
+            self.ship.plan_route, destination, fuel=self.fuel
+        )
+        if not route or not route["legs"]:
+            logger.error(f"{self.ship.shipSymbol}: no route to {destination}.")
+            self.stage = "IDLE"
+            return ERROR_BACKOFF_SECONDS
+
+        leg = route["legs"][0]
+        if route["refuel_at_origin"] and self.fuel["current"] < leg["fuel"]:
+            await self.ship.dock_async()
+            self._apply(await self.ship.refuel_async())
+            await self.ship.orbit_async()
+        if leg["flight_mode"] != self.ship.flightMode:
+            await self.ship.change_flight_mode_async(leg["flight_mode"])
+            self.ship.flightMode = leg["flight_mode"]
+
+        response = await self.ship.travel_to_waypoint_async(leg["to"])
+        if not self._apply(response):
+            self.stage = "IDLE"
+            return ERROR_BACKOFF_SECONDS
+        nav = response["data"]["nav"]
+        self.ship.waypointSymbol = nav["waypointSymbol"]
+        self.ship.status = "IN_ORBIT"  # by the time we wake up
+        return seconds_until(nav["route"]["arrival"])
+
+    async def _sell_all(self):
+        """Sells the whole hold at the current waypoint; returns True if cargo dropped.
+
+        Each sale stays within the market's trade volume (the API rejects larger
+        transactions); selling stops at the first rejected sale.
+        """
+        before = self.cargo_units
+        engine = await asyncio.to_thread(get_trade_route_engine)
+        volumes = engine.trade_volumes(self.ship.waypointSymbol)
+        await self.ship.dock_async()
+        for symbol, units in list(self.inventory.items()):
+            while units > 0:
+                chunk = min(units, volumes.get(symbol) or units)
+                if not self._apply(await self.ship.sell_cargo_async(symbol, chunk)):
+                    logger.warning(
+                        f"{self.ship.shipSymbol}: could not sell {chunk} {symbol} "
+                        f"at {self.ship.waypointSymbol}."
+                    )
+                    break
+                units = min(units - chunk, self.inventory.get(symbol, 0))
+            if units > 0:
+                break
+        self._apply(await self.ship.refuel_async())
+        await self.ship.orbit_async()
+        return self.cargo_units < before
+
+    async def _finish_task(self):
+        self._release()
+        await self.ship.refresh_async()
+
+    def _apply(self, response):
+        """Updates local fuel/cargo from an action response; returns False on failure."""
+        data = (response or {}).get("data")
+        if not data:
+            return False
+        if "fuel" in data:
+            self.fuel = {**self.fuel, **data["fuel"]}
+        if "cargo" in data:
+            self.inventory = {
+                item["symbol"]: item["units"] for item in data["cargo"]["inventory"]
+            }
+        return True
+
+    def _release(self):
+        if self.route is not None:
+            self.scheduler.release_route(self.route)
+            self.route = None
+
+
+class FleetScheduler:
+    """Drives every ship of a player from one event loop.
+
+    Ships do not get a sleeping coroutine each: every ship has one entry in a heap of
+    wake-up times (arrival, cooldown expiry or an idle recheck) and the loop sleeps
+    until the earliest is due. Due ships run one step each, at most `concurrency`
+    at a time, and are pushed back with their next wake-up time.
+    """
+
+    def __init__(self, player, ship_symbols=None, concurrency=16) -> None:
+        self.player = player
+        self.ship_symbols = list(ship_symbols or player.shipSymbols)
+        self.concurrency = concurrency
+        self.agents = {}
+        self._payloads = {p["symbol"]: p for p in player.ship_payloads}
+        self._timers = []
+        self._sequence = itertools.count()
+        self._claimed = set()
+        self._running = False
+        self._wakeup = None
+        self._semaphore = None
+
+    def schedule(self, ship_symbol, delay=0.0):
+        heapq.heappush(
+            self._timers,
+            (time.monotonic() + delay, next(self._sequence), ship_symbol),
+        )
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def claim_route(self, agent):
+        """Best unclaimed route in the ship's system, so ships do not chase the same pair."""
+        engine = await asyncio.to_thread(get_trade_route_engine)
+        routes = engine.best_routes(
+            agent.cargo_capacity,
+            agent.ship.speed,
+            system_symbol=agent.ship.systemSymbol,
+            per_good=False,
+            limit=ROUTE_CANDIDATES,
+        )
+        for route in routes.to_dict("records"):
+            key = (route["product_symbol"], route["buy_waypoint"])
+            if key not in self._claimed:
+                self._claimed.add(key)
+                return route
+        return None
+
+    def release_route(self, route):
+        self._claimed.discard((route["product_symbol"], route["buy_waypoint"]))
+
+    async def _load_agent(self, ship_symbol):
+        ship = await asyncio.to_thread(
+            SpaceShip.load_or_create, player=self.player, shipSymbol=ship_symbol
+        )
+        # Cargo units are only in the API payload (the DB keeps inventory symbols),
+        # so use the page the player already fetched or a single GET.
+        payload = self._payloads.get(ship_symbol)
+        if payload is None:
+            payload = await ship.update_from_api_async() or {}
+        return ShipAgent(self, ship, payload.get("fuel"), payload.get("cargo"))
+
+    async def run(self, duration=None):
+        """Runs until stop() is called or `duration` seconds have passed."""
+        self._wakeup = asyncio.Event()
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        agents = await asyncio.gather(
+            *map(self._load_agent, self.ship_symbols), return_exceptions=True
+        )
+        for symbol, agent in zip(self.ship_symbols, agents):
+            if isinstance(agent, Exception):
+                logger.error(f"{symbol}: could not load ship, skipping it: {agent}")
+            else:
+                self.agents[agent.ship.shipSymbol] = agent
+        for symbol in self.agents:
+            self.schedule(symbol)
+        logger.info(f"Fleet scheduler started with {len(self.agents)} ships.")
+
+        deadline = time.monotonic() + duration if duration else None
+        tasks = set()
+        self._running = True
+        while self._running:
+            self._wakeup.clear()
+            now = time.monotonic()
+            if deadline and now >= deadline:
+                break
+            while self._timers and self._timers[0][0] <= now:
+                _, _, symbol = heapq.heappop(self._timers)
+                task = asyncio.create_task(self._run_step(symbol))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+
+            next_timer = self._timers[0][0] if self._timers else None
+            wake_at = [t for t in (next_timer, deadline) if t is not None]
+            timeout = max(min(wake_at) - now, 0) if wake_at else None
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        logger.info("Fleet scheduler stopped.")
+
+    def stop(self):
+        self._running = False
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _run_step(self, ship_symbol):
+        agent = self.agents[ship_symbol]
+        async with self._semaphore:
+            try:
+                delay = await agent.step()
+            except Exception as e:
+                logger.error(f"{ship_symbol}: step {agent.stage} failed: {e}")
+                agent.stage = "IDLE"
+                delay = ERROR_BACKOFF_SECONDS
+        if self._running:
+            self.schedule(ship_symbol, delay)
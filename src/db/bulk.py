@@ -0,0 +1,172 @@
+from geoalchemy2.elements import WKTElement
+from sqlalchemy import Integer, column, delete, func, select, update, values
+from sqlalchemy.dialects.postgresql import insert
+from src.db.models import MarketTradeGoods, System, SystemConnection, Waypoint
+
+BATCH_SIZE = 1000
+
+
+def chunked(rows, size=BATCH_SIZE):
+    for start in range(0, len(rows), size):
+        yield rows[start : start + size]
+
+
+def point(x, y):
+    return WKTElement(f"POINT({float(x)} {float(y)})", srid=0)
+
+
+def _insert_returning_ids(session, model, key_column, rows):
+    """Inserts rows that do not exist yet and returns {key: id} for every row."""
+    ids = {}
+    if not rows:
+        return ids
+
+    key_name = key_column.key
+    for batch in chunked(rows):
+        stmt = (
+            insert(model)
+            .values(batch)
+            .on_conflict_do_nothing(index_elements=[key_column])
+            .returning(model.id, key_column)
+        )
+        for row_id, key in session.execute(stmt):
+            ids[key] = row_id
+
+        missing = [row[key_name] for row in batch if row[key_name] not in ids]
+        if missing:
+            existing = session.execute(
+                select(model.id, key_column).where(key_column.in_(missing))
+            )
+            for row_id, key in existing:
+                ids[key] = row_id
+    return ids
+
+
+def upsert_systems(session, systems):
+    """Writes /systems payloads and returns {system_symbol: system_id}."""
+    rows = {}
+    for system in systems:
+        rows[system["symbol"]] = {
+            "symbol": system["symbol"],
+            "constellation": system.get("constellation", "UNKNOWN"),
+            "name": system.get("name", "UNKNOWN"),
+            "sector_symbol": system.get("sectorSymbol", "UNKNOWN"),
+            "location": point(system.get("x", 0), system.get("y", 0)),
+        }
+    return _insert_returning_ids(session, System, System.symbol, list(rows.values()))
+
+
+def upsert_waypoints(session, systems, system_ids):
+    """Writes the waypoints nested in /systems payloads and returns {waypoint_symbol: id}."""
+    rows = {}
+    for system in systems:
+        system_id = system_ids.get(system["symbol"])
+        if system_id is None:
+            continue
+        for wp in system.get("waypoints", []):
+            rows.setdefault(
+                wp["symbol"],
+                {
+                    "waypoint_symbol": wp["symbol"],
+                    "waypoint_type": wp["type"],
+                    "waypoint_location": point(wp["x"], wp["y"]),
+                    "system_id": system_id,
+                    "parent_waypoint_id": None,
+                },
+            )
+    return _insert_returning_ids(
+        session, Waypoint, Waypoint.waypoint_symbol, list(rows.values())
+    )
+
+
+def link_waypoint_parents(session, systems, waypoint_ids):
+    """Sets parent_waypoint_id for orbiting waypoints in one UPDATE per batch."""
+    links = []
+    for system in systems:
+        for wp in system.get("waypoints", []):
+            child = waypoint_ids.get(wp["symbol"])
+            parent = waypoint_ids.get(wp.get("orbits"))
+            if child and parent:
+                links.append((child, parent))
+
+    updated = 0
+    for batch in chunked(links):
+        pairs = values(
+            column("child_id", Integer), column("parent_id", Integer), name="links"
+        ).data(batch)
+        stmt = (
+            update(Waypoint)
+            .where(Waypoint.id == pairs.c.child_id)
+            .where(Waypoint.parent_waypoint_id.is_distinct_from(pairs.c.parent_id))
+            .values(parent_waypoint_id=pairs.c.parent_id)
+        )
+        updated += session.execute(stmt).rowcount
+    return updated
+
+
+def store_systems_bulk(session, systems):
+    """Writes systems, waypoints and orbit links for one /systems page."""
+    system_ids = upsert_systems(session, systems)
+    waypoint_ids = upsert_waypoints(session, systems, system_ids)
+    link_waypoint_parents(session, systems, waypoint_ids)
+    return system_ids, waypoint_ids
+
+
+MARKET_GOODS_KEY = ["ship_id", "waypoint_id", "product_symbol"]
+
+
+def upsert_market_goods(session, rows):
+    """Inserts or refreshes market trade goods keyed on (ship_id, waypoint_id, product_symbol)."""
+    rows = list(
+        {
+            tuple(r[k] for k in MARKET_GOODS_KEY): {**r, "last_updated": func.now()}
+            for r in rows
+        }.values()
+    )
+    for batch in chunked(rows):
+        stmt = insert(MarketTradeGoods).values(batch)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=MARKET_GOODS_KEY,
+            set_={
+                "trade_volume": stmt.excluded.trade_volume,
+                "type": stmt.excluded.type,
+                "supply": stmt.excluded.supply,
+                "activity": stmt.excluded.activity,
+                "purchase_price": stmt.excluded.purchase_price,
+                "sell_price": stmt.excluded.sell_price,
+                "demand": stmt.excluded.demand,
+                "last_updated": func.now(),
+            },
+        )
+        session.execute(stmt)
+    return len(rows)
+
+
+def replace_system_connections(session, kind, edges):
+    """Replaces every edge of one kind with (source_id, target_id, distance) tuples."""
+    session.execute(delete(SystemConnection).where(SystemConnection.kind == kind))
+    return upsert_system_connections(session, kind, edges)
+
+
+def upsert_system_connections(session, kind, edges):
+    """Inserts or refreshes (source_id, target_id, distance) edges of one kind."""
+    rows = {}
+    for a, b, distance in edges:
+        if a != b:
+            a, b = min(a, b), max(a, b)
+            rows[(a, b)] = {
+                "source_system_id": int(a),
+                "target_system_id": int(b),
+                "kind": kind,
+                "distance": float(distance),
+                "updated_at": func.now(),
+            }
+    rows = list(rows.values())
+    for batch in chunked(rows):
+        stmt = insert(SystemConnection).values(batch)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["source_system_id", "target_system_id", "kind"],
+            set_={"distance": stmt.excluded.distance, "updated_at": func.now()},
+        )
+        session.execute(stmt)
+    return len(rows)
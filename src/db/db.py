@@ -24,6 +24,31 @@ engine = create_engine(DATABASE_URL, echo=False)
 SessionLocal = sessionmaker(bind=engine, expire_on_commit=False)
 
 
+# create_all() never alters existing tables, so constraints/indexes added to models
+# after a table was first created are applied here. Every statement is idempotent.
+SCHEMA_UPGRADES = [
+    # Keep only the newest row per (ship, waypoint, good) before enforcing uniqueness.
+    f"""
+    DELETE FROM {player_schema}.market_trade_goods a
+    USING {player_schema}.market_trade_goods b
+    WHERE a.ship_id = b.ship_id
+      AND a.waypoint_id = b.waypoint_id
+      AND a.product_symbol = b.product_symbol
+      AND a.id < b.id
+    """,
+    f"""
+    CREATE UNIQUE INDEX IF NOT EXISTS uq_market_trade_goods_ship_waypoint_product
+    ON {player_schema}.market_trade_goods (ship_id, waypoint_id, product_symbol)
+    """,
+]
+
+
+def upgrade_schema():
+    with engine.begin() as conn:
+        for statement in SCHEMA_UPGRADES:
+            conn.execute(text(statement))
+
+
 def init_db():
     # Create schema if it doesn't exist
     with engine.connect() as conn:
@@ -32,6 +57,7 @@ def init_db():
     # Base.metadata.drop_all(bind=engine, tables=tables_to_drop)
     # Create tables within the schema
     Base.metadata.create_all(engine)
+    upgrade_schema()
 
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
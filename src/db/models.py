@@ -1,11 +1,13 @@
 from sqlalchemy import (
     Column,
     Integer,
+    SmallInteger,
     String,
     ForeignKey,
     BigInteger,
     Index,
     Boolean,
+    Float,
 )
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import JSONB, ARRAY
@@ -307,6 +309,9 @@ class ShipCooldown(Base):
 
 
 class ShipTelemetry(Base):
+    """Legacy snapshots linking mutable component rows; no longer written, see
+    ShipStateSample for ship state history."""
+
     __tablename__ = "ship_telemetry"
     __table_args__ = {"schema": player_schema}
 
@@ -340,6 +345,34 @@ class ShipTelemetry(Base):
         return f"<ShipTelemetry(id={self.id}, ship_id={self.ship_id}, timestamp={self.timestamp})>"
 
 
+class ShipTrip(Base):
+    """One row per navigate call, so fuel and travel time can be learned from history."""
+
+    __tablename__ = "ship_trips"
+    __table_args__ = {"schema": player_schema}
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    ship_id = Column(
+        Integer, ForeignKey(f"{player_schema}.ships.id"), nullable=False, index=True
+    )
+    system_symbol = Column(String, nullable=False)
+    origin_waypoint = Column(String, nullable=False)
+    destination_waypoint = Column(String, nullable=False)
+    distance = Column(Float, nullable=False)
+    flight_mode = Column(String, nullable=False)
+    frame_symbol = Column(String, nullable=True)
+    engine_symbol = Column(String, nullable=True)
+    engine_speed = Column(Integer, nullable=False)
+    fuel_consumed = Column(Integer, nullable=False)
+    fuel_after = Column(Integer, nullable=False)
+    duration_seconds = Column(Float, nullable=False)
+    departed_at = Column(DateTime(timezone=True), nullable=False, index=True)
+    arrived_at = Column(DateTime(timezone=True), nullable=False)
+
+    def __repr__(self):
+        return f"<ShipTrip(ship_id={self.ship_id}, {self.origin_waypoint}->{self.destination_waypoint})>"
+
+
 class System(Base):
     """Stores system information."""
 
@@ -396,11 +429,67 @@ class Waypoint(Base):
 Index("ix_waypoints_location", Waypoint.waypoint_location, postgresql_using="gist")
 
 
+class SystemConnection(Base):
+    """Undirected inter-system edge (jump gate link or warp hop), stored once with source < target."""
+
+    __tablename__ = "system_connections"
+    __table_args__ = {"schema": player_schema}
+
+    source_system_id = Column(
+        Integer, ForeignKey(f"{player_schema}.systems.id"), primary_key=True
+    )
+    target_system_id = Column(
+        Integer, ForeignKey(f"{player_schema}.systems.id"), primary_key=True
+    )
+    kind = Column(String, primary_key=True)  # "JUMP" or "WARP"
+    distance = Column(Float, nullable=False)
+    updated_at = Column(
+        DateTime(timezone=True), default=func.now(), onupdate=func.now(), nullable=False
+    )
+
+    def __repr__(self):
+        return f"<SystemConnection({self.source_system_id}-{self.target_system_id}, kind={self.kind})>"
+
+
+class CrawlCheckpoint(Base):
+    """Stores progress of a paginated universe crawl so it can resume after a failure."""
+
+    __tablename__ = "crawl_checkpoints"
+    __table_args__ = {"schema": player_schema}
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    name = Column(String, unique=True, nullable=False)
+    page_limit = Column(Integer, nullable=False)
+    total_systems = Column(Integer, nullable=False, default=0)
+    total_pages = Column(Integer, nullable=False, default=0)
+    # Highest page N such that pages 1..N are all stored.
+    last_completed_page = Column(Integer, nullable=False, default=0)
+    completed_pages = Column(ARRAY(Integer), nullable=False, default=list)
+    # page number (as string) -> hash of the page payload last written
+    page_hashes = Column(JSONB, nullable=False, default=dict)
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    completed_at = Column(DateTime(timezone=True), nullable=True)
+    updated_at = Column(
+        DateTime(timezone=True), default=func.now(), onupdate=func.now(), nullable=False
+    )
+
+    def __repr__(self):
+        return f"<CrawlCheckpoint(name={self.name}, last_completed_page={self.last_completed_page})>"
+
+
 class MarketTradeGoods(Base):
     """Stores market trade goods information."""
 
     __tablename__ = "market_trade_goods"
-    __table_args__ = {"schema": player_schema}
+    __table_args__ = (
+        UniqueConstraint(
+            "ship_id",
+            "waypoint_id",
+            "product_symbol",
+            name="uq_market_trade_goods_ship_waypoint_product",
+        ),
+        {"schema": player_schema},
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     ship_id = Column(
@@ -431,3 +520,118 @@ class MarketTradeGoods(Base):
 
 
 Index("ix_waypoint_product", "waypoint_id", "product_symbol")
+
+
+# ----------------------------
+# Market Price History
+# ----------------------------
+class MarketPriceObservation(Base):
+    """Append-only price observations, range-partitioned by day on observed_at.
+
+    supply/activity are stored as small integer codes (see src.db.price_history)
+    and there is no foreign key, to keep rows narrow and inserts cheap.
+    """
+
+    __tablename__ = "market_price_history"
+    __table_args__ = {
+        "schema": player_schema,
+        "postgresql_partition_by": "RANGE (observed_at)",
+    }
+
+    waypoint_id = Column(Integer, primary_key=True)
+    product_symbol = Column(String, primary_key=True)
+    observed_at = Column(DateTime(timezone=True), primary_key=True)
+    purchase_price = Column(Integer, nullable=False)
+    sell_price = Column(Integer, nullable=False)
+    trade_volume = Column(Integer, nullable=False)
+    supply = Column(SmallInteger, nullable=False)
+    activity = Column(SmallInteger, nullable=False)
+
+    def __repr__(self):
+        return f"<MarketPriceObservation(waypoint_id={self.waypoint_id}, product_symbol={self.product_symbol}, observed_at={self.observed_at})>"
+
+
+class MarketPriceDaily(Base):
+    """Daily rollup of market_price_history kept after raw partitions are dropped."""
+
+    __tablename__ = "market_price_daily"
+    __table_args__ = {"schema": player_schema}
+
+    waypoint_id = Column(Integer, primary_key=True)
+    product_symbol = Column(String, primary_key=True)
+    day = Column(DateTime(timezone=True), primary_key=True)
+    samples = Column(Integer, nullable=False)
+    purchase_price_min = Column(Integer, nullable=False)
+    purchase_price_max = Column(Integer, nullable=False)
+    purchase_price_avg = Column(Integer, nullable=False)
+    sell_price_min = Column(Integer, nullable=False)
+    sell_price_max = Column(Integer, nullable=False)
+    sell_price_avg = Column(Integer, nullable=False)
+    trade_volume_avg = Column(Integer, nullable=False)
+
+    def __repr__(self):
+        return f"<MarketPriceDaily(waypoint_id={self.waypoint_id}, product_symbol={self.product_symbol}, day={self.day})>"
+
+
+# ----------------------------
+# Ship State History
+# ----------------------------
+class ShipStateSample(Base):
+    """Append-only ship state snapshots, range-partitioned by day on recorded_at.
+
+    Values are copied (not linked), status/flight mode are small integer codes
+    (see src.db.ship_history) and there is no foreign key, to keep rows narrow.
+    """
+
+    __tablename__ = "ship_state_history"
+    __table_args__ = {
+        "schema": player_schema,
+        "postgresql_partition_by": "RANGE (recorded_at)",
+    }
+
+    ship_id = Column(Integer, primary_key=True)
+    recorded_at = Column(DateTime(timezone=True), primary_key=True)
+    status = Column(SmallInteger, nullable=False)
+    flight_mode = Column(SmallInteger, nullable=False)
+    waypoint_symbol = Column(String, nullable=False)
+    fuel_current = Column(Integer, nullable=False)
+    fuel_capacity = Column(Integer, nullable=False)
+    cargo_units = Column(Integer, nullable=False)
+    cargo_capacity = Column(Integer, nullable=False)
+    frame_condition = Column(Float)
+    reactor_condition = Column(Float)
+    engine_condition = Column(Float)
+    cooldown_remaining = Column(Integer, nullable=False)
+
+    def __repr__(self):
+        return f"<ShipStateSample(ship_id={self.ship_id}, recorded_at={self.recorded_at})>"
+
+
+# Time-range scans across ships; per-ship lookups use the (ship_id, recorded_at) key.
+Index(
+    "ix_ship_state_history_recorded_at",
+    ShipStateSample.recorded_at,
+    postgresql_using="brin",
+)
+
+
+class ShipStateHourly(Base):
+    """Hourly rollup of ship_state_history kept after raw partitions are dropped."""
+
+    __tablename__ = "ship_state_hourly"
+    __table_args__ = {"schema": player_schema}
+
+    ship_id = Column(Integer, primary_key=True)
+    hour = Column(DateTime(timezone=True), primary_key=True)
+    samples = Column(Integer, nullable=False)
+    fuel_min = Column(Integer, nullable=False)
+    fuel_max = Column(Integer, nullable=False)
+    fuel_avg = Column(Integer, nullable=False)
+    cargo_units_avg = Column(Integer, nullable=False)
+    cargo_units_max = Column(Integer, nullable=False)
+    frame_condition_min = Column(Float)
+    reactor_condition_min = Column(Float)
+    engine_condition_min = Column(Float)
+
+    def __repr__(self):
+        return f"<ShipStateHourly(ship_id={self.ship_id}, hour={self.hour})>"
@@ -0,0 +1,126 @@
+import threading
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import text
+from src.utils.logger import logger
+
+# Partitions are named <table>_pYYYYMMDD and cover one UTC day each.
+_ensured_lock = threading.Lock()
+_ensured = set()  # (table fullname, day) already created by this process
+
+
+# History tables store categorical values as SMALLINT positions in a fixed tuple.
+UNKNOWN_LEVEL = -1
+
+
+def encode_level(levels, value):
+    try:
+        return levels.index(value)
+    except ValueError:
+        return UNKNOWN_LEVEL
+
+
+def decode_level(levels, code):
+    return levels[code] if 0 <= code < len(levels) else "UNKNOWN"
+
+
+def partition_name(table, day):
+    return f"{table.name}_p{day:%Y%m%d}"
+
+
+def _day(value):
+    if isinstance(value, datetime):
+        return value.astimezone(timezone.utc).date()
+    return value
+
+
+def ensure_daily_partitions(engine, table, first_day, last_day=None):
+    """Creates the daily partitions of `table` covering first_day..last_day (inclusive).
+
+    DDL runs in its own committed transaction, and days already created by this
+    process are skipped without touching the database.
+    """
+    first_day = _day(first_day)
+    last_day = _day(last_day) if last_day else first_day
+    missing = []
+    day = first_day
+    while day <= last_day:
+        if (table.fullname, day) not in _ensured:
+            missing.append(day)
+        day += timedelta(days=1)
+    if not missing:
+        return
+
+    with engine.begin() as conn:
+        for day in missing:
+            conn.execute(
+                text(
+                    f"CREATE TABLE IF NOT EXISTS {table.schema}.{partition_name(table, day)} "
+                    f"PARTITION OF {table.fullname} "
+                    f"FOR VALUES FROM ('{day.isoformat()} 00:00:00+00') "
+                    f"TO ('{(day + timedelta(days=1)).isoformat()} 00:00:00+00')"
+                )
+            )
+    with _ensured_lock:
+        _ensured.update((table.fullname, day) for day in missing)
+
+
+def ensure_current_partitions(engine, table, moment):
+    """Creates the partitions for `moment`'s day and the next one, so a writer
+    running over midnight never hits a missing partition."""
+    ensure_daily_partitions(engine, table, moment, moment + timedelta(days=1))
+
+
+def list_daily_partitions(conn, table):
+    """Returns [(partition_name, day)] for every daily partition attached to `table`."""
+    rows = conn.execute(
+        text("""
+            SELECT child.relname
+            FROM pg_inherits
+            JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+            JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+            JOIN pg_namespace ns ON ns.oid = parent.relnamespace
+            WHERE parent.relname = :table AND ns.nspname = :schema
+            """),
+        {"table": table.name, "schema": table.schema},
+    )
+    prefix = f"{table.name}_p"
+    partitions = []
+    for (name,) in rows:
+        if name.startswith(prefix):
+            try:
+                day = datetime.strptime(name[len(prefix) :], "%Y%m%d").date()
+            except ValueError:
+                continue
+            partitions.append((name, day))
+    return sorted(partitions, key=lambda p: p[1])
+
+
+def drop_partition(conn, table, name, day):
+    """Detaches and drops one daily partition (far cheaper than DELETE + VACUUM)."""
+    conn.execute(
+        text(f"ALTER TABLE {table.fullname} DETACH PARTITION {table.schema}.{name}")
+    )
+    conn.execute(text(f"DROP TABLE {table.schema}.{name}"))
+    with _ensured_lock:
+        _ensured.discard((table.fullname, day))
+    logger.info(f"Dropped partition {table.schema}.{name}")
+
+
+def partitions_older_than(conn, table, days):
+    cutoff = datetime.now(timezone.utc).date() - timedelta(days=days)
+    return [
+        (name, day) for name, day in list_daily_partitions(conn, table) if day < cutoff
+    ]
+
+
+def rollup_and_drop(engine, table, rollup_sql, retention_days):
+    """Rolls every partition of `table` older than retention_days up with
+    `rollup_sql` (a statement reading from its {partition} placeholder), then
+    drops it; all in one transaction. Returns the number of partitions dropped."""
+    dropped = 0
+    with engine.begin() as conn:
+        for name, day in partitions_older_than(conn, table, retention_days):
+            conn.execute(text(rollup_sql.format(partition=f"{table.schema}.{name}")))
+            drop_partition(conn, table, name, day)
+            dropped += 1
+    return dropped
@@ -0,0 +1,81 @@
+from datetime import datetime, timezone
+from sqlalchemy.dialects.postgresql import insert
+from src.db.bulk import chunked
+from src.db.db import engine
+from src.db.models import MarketPriceDaily, MarketPriceObservation
+from src.db.partitions import encode_level, ensure_current_partitions, rollup_and_drop
+from src.utils.logger import logger
+
+SUPPLY_LEVELS = ("SCARCE", "LIMITED", "MODERATE", "HIGH", "ABUNDANT")
+ACTIVITY_LEVELS = ("WEAK", "GROWING", "STRONG", "RESTRICTED")
+RAW_RETENTION_DAYS = 14
+
+
+def price_observation_rows(goods_rows, observed_at):
+    """Converts market_trade_goods rows into compact price-history rows."""
+    return [
+        {
+            "waypoint_id": row["waypoint_id"],
+            "product_symbol": row["product_symbol"],
+            "observed_at": observed_at,
+            "purchase_price": row["purchase_price"],
+            "sell_price": row["sell_price"],
+            "trade_volume": row["trade_volume"],
+            "supply": encode_level(SUPPLY_LEVELS, row["supply"]),
+            "activity": encode_level(ACTIVITY_LEVELS, row["activity"]),
+        }
+        for row in goods_rows
+    ]
+
+
+def record_price_observations(session, goods_rows, observed_at=None):
+    """Appends one observation per (waypoint, good) seen in a market sweep."""
+    if not goods_rows:
+        return 0
+    observed_at = observed_at or datetime.now(timezone.utc)
+    ensure_current_partitions(
+        session.get_bind(), MarketPriceObservation.__table__, observed_at
+    )
+
+    rows = price_observation_rows(goods_rows, observed_at)
+    for batch in chunked(rows):
+        session.execute(
+            insert(MarketPriceObservation).values(batch).on_conflict_do_nothing()
+        )
+    return len(rows)
+
+
+DAILY_ROLLUP_SQL = f"""
+    INSERT INTO {MarketPriceDaily.__table__.fullname} (
+        waypoint_id, product_symbol, day, samples,
+        purchase_price_min, purchase_price_max, purchase_price_avg,
+        sell_price_min, sell_price_max, sell_price_avg, trade_volume_avg
+    )
+    SELECT waypoint_id, product_symbol,
+           date_trunc('day', observed_at AT TIME ZONE 'UTC') AT TIME ZONE 'UTC',
+           count(*),
+           min(purchase_price), max(purchase_price), round(avg(purchase_price)),
+           min(sell_price), max(sell_price), round(avg(sell_price)),
+           round(avg(trade_volume))
+    FROM {{partition}}
+    GROUP BY waypoint_id, product_symbol,
+             date_trunc('day', observed_at AT TIME ZONE 'UTC')
+    ON CONFLICT (waypoint_id, product_symbol, day) DO UPDATE SET
+        samples = excluded.samples,
+        purchase_price_min = excluded.purchase_price_min,
+        purchase_price_max = excluded.purchase_price_max,
+        purchase_price_avg = excluded.purchase_price_avg,
+        sell_price_min = excluded.sell_price_min,
+        sell_price_max = excluded.sell_price_max,
+        sell_price_avg = excluded.sell_price_avg,
+        trade_volume_avg = excluded.trade_volume_avg
+"""
+
+
+def rollup_and_prune(retention_days=RAW_RETENTION_DAYS):
+    """Rolls raw partitions older than retention_days into market_price_daily, then drops them."""
+    dropped = rollup_and_drop(
+        engine, MarketPriceObservation.__table__, DAILY_ROLLUP_SQL, retention_days
+    )
+    logger.info(f"Rolled up and dropped {dropped} price-history partitions.")
+    return dropped
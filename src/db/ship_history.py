@@ -0,0 +1,125 @@
+from datetime import datetime, timezone
+from sqlalchemy.dialects.postgresql import insert
+from src.db.bulk import chunked
+from src.db.db import engine
+from src.db.models import ShipStateHourly, ShipStateSample
+from src.db.partitions import (
+    decode_level,
+    encode_level,
+    ensure_current_partitions,
+    rollup_and_drop,
+)
+from src.utils.logger import logger
+
+NAV_STATUSES = ("IN_TRANSIT", "IN_ORBIT", "DOCKED")
+FLIGHT_MODES = ("DRIFT", "STEALTH", "CRUISE", "BURN")
+RAW_RETENTION_DAYS = 7
+
+
+def ship_state_row(ship_id, payload, recorded_at):
+    """Flattens a /my/ships payload into one compact ship_state_history row."""
+    nav, fuel = payload.get("nav") or {}, payload.get("fuel") or {}
+    cargo = payload.get("cargo") or {}
+    return {
+        "ship_id": ship_id,
+        "recorded_at": recorded_at,
+        "status": encode_level(NAV_STATUSES, nav.get("status")),
+        "flight_mode": encode_level(FLIGHT_MODES, nav.get("flightMode")),
+        "waypoint_symbol": nav.get("waypointSymbol", "UNKNOWN"),
+        "fuel_current": fuel.get("current", 0),
+        "fuel_capacity": fuel.get("capacity", 0),
+        "cargo_units": cargo.get("units", 0),
+        "cargo_capacity": cargo.get("capacity", 0),
+        "frame_condition": (payload.get("frame") or {}).get("condition"),
+        "reactor_condition": (payload.get("reactor") or {}).get("condition"),
+        "engine_condition": (payload.get("engine") or {}).get("condition"),
+        "cooldown_remaining": (payload.get("cooldown") or {}).get(
+            "remainingSeconds", 0
+        ),
+    }
+
+
+def record_ship_states(session, payloads_by_ship_id, recorded_at=None):
+    """Appends one state sample per ship; payloads_by_ship_id maps ship_id -> payload."""
+    if not payloads_by_ship_id:
+        return 0
+    recorded_at = recorded_at or datetime.now(timezone.utc)
+    ensure_current_partitions(
+        session.get_bind(), ShipStateSample.__table__, recorded_at
+    )
+
+    rows = [
+        ship_state_row(ship_id, payload, recorded_at)
+        for ship_id, payload in payloads_by_ship_id.items()
+    ]
+    for batch in chunked(rows):
+        session.execute(insert(ShipStateSample).values(batch).on_conflict_do_nothing())
+    return len(rows)
+
+
+def ship_state_history(session, ship_id, since, until=None):
+    """Samples of one ship in [since, until) as dicts with decoded status/flight mode.
+
+    The (ship_id, recorded_at) primary key plus partition pruning on recorded_at
+    keep this an index range scan over the touched days only.
+    """
+    query = session.query(ShipStateSample).filter(
+        ShipStateSample.ship_id == ship_id, ShipStateSample.recorded_at >= since
+    )
+    if until is not None:
+        query = query.filter(ShipStateSample.recorded_at < until)
+    return [
+        {
+            "recorded_at": sample.recorded_at,
+            "status": decode_level(NAV_STATUSES, sample.status),
+            "flight_mode": decode_level(FLIGHT_MODES, sample.flight_mode),
+            "waypoint_symbol": sample.waypoint_symbol,
+            "fuel_current": sample.fuel_current,
+            "fuel_capacity": sample.fuel_capacity,
+            "cargo_units": sample.cargo_units,
+            "cargo_capacity": sample.cargo_capacity,
+            "frame_condition": sample.frame_condition,
+            "reactor_condition": sample.reactor_condition,
+            "engine_condition": sample.engine_condition,
+            "cooldown_remaining": sample.cooldown_remaining,
+        }
+        for sample in query.order_by(ShipStateSample.recorded_at)
+    ]
+
+
+HOURLY_ROLLUP_SQL = f"""
+    INSERT INTO {ShipStateHourly.__table__.fullname} (
+        ship_id, hour, samples, fuel_min, fuel_max, fuel_avg,
+        cargo_units_avg, cargo_units_max, frame_condition_min,
+        reactor_condition_min, engine_condition_min
+    )
+    SELECT ship_id,
+           date_trunc('hour', recorded_at AT TIME ZONE 'UTC') AT TIME ZONE 'UTC',
+           count(*),
+           min(fuel_current), max(fuel_current), round(avg(fuel_current)),
+           round(avg(cargo_units)), max(cargo_units),
+           min(frame_condition), min(reactor_condition),
+           min(engine_condition)
+    FROM {{partition}}
+    GROUP BY ship_id, date_trunc('hour', recorded_at AT TIME ZONE 'UTC')
+    ON CONFLICT (ship_id, hour) DO UPDATE SET
+        samples = excluded.samples,
+        fuel_min = excluded.fuel_min,
+        fuel_max = excluded.fuel_max,
+        fuel_avg = excluded.fuel_avg,
+        cargo_units_avg = excluded.cargo_units_avg,
+        cargo_units_max = excluded.cargo_units_max,
+        frame_condition_min = excluded.frame_condition_min,
+        reactor_condition_min = excluded.reactor_condition_min,
+        engine_condition_min = excluded.engine_condition_min
+"""
+
+
+def rollup_and_prune(retention_days=RAW_RETENTION_DAYS):
+    """Downsamples raw partitions older than retention_days into ship_state_hourly,
+    then drops them."""
+    dropped = rollup_and_drop(
+        engine, ShipStateSample.__table__, HOURLY_ROLLUP_SQL, retention_days
+    )
+    logger.info(f"Rolled up and dropped {dropped} ship-state partitions.")
+    return dropped
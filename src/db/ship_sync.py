@@ -0,0 +1,368 @@
+from datetime import datetime, timezone
+from sqlalchemy import update
+from sqlalchemy.dialects.postgresql import insert
+from src.db.bulk import chunked
+from src.db.ship_history import record_ship_states
+from src.db.models import (
+    Module,
+    Mount,
+    Ship,
+    ShipCargo,
+    ShipCooldown,
+    ShipCrew,
+    ShipEngine,
+    ShipFrame,
+    ShipFuel,
+    ShipNavigation,
+    ShipReactor,
+    ShipStateSample,
+)
+
+
+# Payload -> row mappers. A payload is the "data" object of /my/ships/{symbol}
+# (or one element of /my/ships); rows never include ship_id.
+def _naive_utc(timestamp):
+    if not timestamp:
+        return None
+    value = datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def ship_row(payload):
+    registration, nav = payload.get("registration", {}), payload.get("nav", {})
+    return {
+        "symbol": payload["symbol"],
+        "factionSymbol": registration.get("factionSymbol", "UNKNOWN"),
+        "role": registration.get("role", "UNKNOWN"),
+        "status": nav.get("status", "UNKNOWN"),
+        "flightMode": nav.get("flightMode", "UNKNOWN"),
+        "systemSymbol": nav.get("systemSymbol", "UNKNOWN"),
+        "waypointSymbol": nav.get("waypointSymbol", "UNKNOWN"),
+        "speed": payload.get("engine", {}).get("speed", 0),
+    }
+
+
+def navigation_row(payload):
+    nav = payload.get("nav", {})
+    route = nav.get("route", {})
+    origin, destination = route.get("origin"), route.get("destination")
+    if not origin or not destination:
+        return None
+    return {
+        "origin_waypoint": origin.get("symbol"),
+        "origin_system": origin.get("systemSymbol"),
+        "destination_waypoint": destination.get("symbol"),
+        "destination_system": destination.get("systemSymbol"),
+        "departure_time": _naive_utc(route.get("departureTime")),
+        "arrival_time": _naive_utc(route.get("arrival")),
+        "status": nav.get("status"),
+        "flightMode": nav.get("flightMode"),
+    }
+
+
+def fuel_row(payload):
+    fuel = payload.get("fuel")
+    if not fuel:
+        return None
+    consumed = fuel.get("consumed") or {}
+    return {
+        "current": fuel.get("current", 0),
+        "capacity": fuel.get("capacity", 0),
+        "consumed": (
+            consumed.get("amount", 0) if isinstance(consumed, dict) else consumed
+        ),
+    }
+
+
+def cargo_row(payload):
+    cargo = payload.get("cargo")
+    if not cargo:
+        return None
+    return {
+        "current": cargo.get("units", 0),
+        "capacity": cargo.get("capacity", 0),
+        "inventory": [
+            item.get("symbol")
+            for item in cargo.get("inventory", [])
+            if "symbol" in item
+        ],
+    }
+
+
+def crew_row(payload):
+    crew = payload.get("crew")
+    if not crew:
+        return None
+    return {
+        "current": crew.get("current", 0),
+        "capacity": crew.get("capacity", 0),
+        "required": crew.get("required", 0),
+        "rotation": crew.get("rotation", 0),
+        "morale": crew.get("morale", 0),
+        "wages": crew.get("wages", 0),
+    }
+
+
+def frame_row(payload):
+    frame = payload.get("frame")
+    if not frame:
+        return None
+    requirements = frame.get("requirements", {})
+    return {
+        "symbol": frame.get("symbol", ""),
+        "name": frame.get("name", ""),
+        "condition": frame.get("condition", 0),
+        "integrity": frame.get("integrity", 0),
+        "module_slots": frame.get("moduleSlots", 0),
+        "mounting_points": frame.get("mountingPoints", 0),
+        "power_required": requirements.get("power", 0),
+        "crew_required": requirements.get("crew", 0),
+    }
+
+
+def reactor_row(payload):
+    reactor = payload.get("reactor")
+    if not reactor:
+        return None
+    return {
+        "symbol": reactor.get("symbol", ""),
+        "name": reactor.get("name", ""),
+        "condition": reactor.get("condition", 0),
+        "integrity": reactor.get("integrity", 0),
+        "power_output": reactor.get("powerOutput", 0),
+        "crew_required": reactor.get("requirements", {}).get("crew", 0),
+        "quality": reactor.get("quality", 0),
+    }
+
+
+def engine_row(payload):
+    engine = payload.get("engine")
+    if not engine:
+        return None
+    requirements = engine.get("requirements", {})
+    return {
+        "symbol": engine.get("symbol", ""),
+        "name": engine.get("name", ""),
+        "condition": engine.get("condition", 0),
+        "integrity": engine.get("integrity", 0),
+        "speed": engine.get("speed", 0),
+        "power_required": requirements.get("power", 0),
+        "crew_required": requirements.get("crew", 0),
+        "quality": engine.get("quality", 0),
+    }
+
+
+def cooldown_row(payload):
+    cooldown = payload.get("cooldown")
+    if not cooldown:
+        return None
+    return {
+        "total_seconds": cooldown.get("totalSeconds", 0),
+        "remaining_seconds": cooldown.get("remainingSeconds", 0),
+    }
+
+
+def module_rows(payload):
+    rows = {}
+    for module in payload.get("modules", []):
+        requirements = module.get("requirements", {})
+        rows[module.get("symbol")] = {
+            "symbol": module.get("symbol"),
+            "name": module.get("name"),
+            "description": module.get("description"),
+            "power": requirements.get("power"),
+            "crew": requirements.get("crew"),
+            "slots": requirements.get("slots"),
+            "capacity": module.get("capacity", requirements.get("capacity")),
+        }
+    return rows
+
+
+def mount_rows(payload):
+    rows = {}
+    for mount in payload.get("mounts", []):
+        requirements = mount.get("requirements", {})
+        rows[mount.get("symbol")] = {
+            "symbol": mount.get("symbol"),
+            "name": mount.get("name"),
+            "description": mount.get("description"),
+            "power": requirements.get("power"),
+            "crew": requirements.get("crew"),
+            "strength": mount.get("strength"),
+        }
+    return rows
+
+
+# One row per ship in each of these tables; values are the payload mappers.
+COMPONENTS = {
+    ShipNavigation: navigation_row,
+    ShipFuel: fuel_row,
+    ShipCargo: cargo_row,
+    ShipCrew: crew_row,
+    ShipFrame: frame_row,
+    ShipReactor: reactor_row,
+    ShipEngine: engine_row,
+    ShipCooldown: cooldown_row,
+}
+CHILDREN = {Module: module_rows, Mount: mount_rows}
+
+
+def _changes(current, row):
+    """Columns of `row` whose value differs from the loaded ORM object."""
+    return {
+        column: value
+        for column, value in row.items()
+        if getattr(current, column) != value
+    }
+
+
+def _diff(current, row, updates):
+    """Queues the changed columns of `current` as a by-primary-key update row."""
+    changes = _changes(current, row)
+    if changes:
+        updates.append({**changes, "id": current.id})
+    return bool(changes)
+
+
+def _bulk_update(session, model, updates):
+    # ORM bulk UPDATE by primary key: one executemany per distinct set of columns.
+    if updates:
+        session.execute(update(model), updates)
+
+
+def load_ships(session, symbols):
+    """Loads ships and every one-per-ship component in one joined query.
+
+    Returns {symbol: (Ship, {model: component})}; ships not in the DB are absent and
+    components a ship does not have yet are missing from its dict.
+    """
+    models = list(COMPONENTS)
+    query = session.query(Ship, *models)
+    for model in models:
+        query = query.outerjoin(model, model.ship_id == Ship.id)
+    loaded = {}
+    for ship, *rows in query.filter(Ship.symbol.in_(list(symbols))):
+        _, components = loaded.setdefault(ship.symbol, (ship, {}))
+        for model, row in zip(models, rows):
+            if row is not None:
+                components.setdefault(model, row)
+    return loaded
+
+
+def write_ships(session, agent_id, payloads, loaded, overrides=None):
+    """Updates changed columns of known ships, upserts new ones; returns {symbol: id}.
+
+    overrides maps symbol -> Ship columns that take precedence over the payload.
+    """
+    overrides = overrides or {}
+    ship_ids, inserts, updates = {}, [], []
+    for symbol, payload in payloads.items():
+        row = {**ship_row(payload), **overrides.get(symbol, {}), "agent_id": agent_id}
+        if symbol in loaded:
+            ship = loaded[symbol][0]
+            _diff(ship, row, updates)
+            ship_ids[symbol] = ship.id
+        else:
+            inserts.append(row)
+    _bulk_update(session, Ship, updates)
+    for batch in chunked(inserts):
+        stmt = insert(Ship)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Ship.symbol],
+            set_={column: stmt.excluded[column] for column in batch[0]},
+        ).returning(Ship.id, Ship.symbol)
+        for ship_id, symbol in session.execute(stmt, batch):
+            ship_ids[symbol] = ship_id
+    return ship_ids
+
+
+def write_components(session, ship_ids, payloads, loaded, models=COMPONENTS):
+    """Diffs `models` against the payloads: missing components are bulk-inserted,
+    changed columns of existing ones go out in one bulk update per table. Returns
+    the number of components updated."""
+    updated = 0
+    for model in models:
+        to_row, inserts, updates = COMPONENTS[model], [], []
+        for symbol, payload in payloads.items():
+            row = to_row(payload)
+            if row is None:
+                continue
+            current = loaded.get(symbol, (None, {}))[1].get(model)
+            if current is None:
+                inserts.append({**row, "ship_id": ship_ids[symbol]})
+            else:
+                updated += _diff(current, row, updates)
+        _bulk_update(session, model, updates)
+        if inserts:
+            session.execute(insert(model), inserts)
+    return updated
+
+
+def write_children(session, model, ship_ids, payloads):
+    """Syncs modules or mounts keyed by (ship_id, symbol): one read, one bulk update
+    of changed columns and one bulk insert for new rows."""
+    existing = {
+        (child.ship_id, child.symbol): child
+        for child in session.query(model).filter(
+            model.ship_id.in_(list(ship_ids.values()))
+        )
+    }
+    inserts, updates = [], []
+    for symbol, payload in payloads.items():
+        ship_id = ship_ids[symbol]
+        for child_symbol, row in CHILDREN[model](payload).items():
+            current = existing.get((ship_id, child_symbol))
+            if current is None:
+                inserts.append({**row, "ship_id": ship_id})
+            else:
+                _diff(current, row, updates)
+    _bulk_update(session, model, updates)
+    if inserts:
+        session.execute(insert(model), inserts)
+
+
+def write_telemetry(session, ship_ids, payloads):
+    """Appends one ship_state_history sample per ship (values, not component links)."""
+    record_ship_states(
+        session, {ship_ids[symbol]: payload for symbol, payload in payloads.items()}
+    )
+
+
+def sync_ships(session, agent_id, payloads, overrides=None):
+    """Writes ships, modules, mounts, components and a state-history sample for many
+    ships with a fixed number of statements; returns {symbol: ship_id}.
+
+    overrides ({symbol: {column: value}}) replaces payload values in the Ship row.
+    """
+    payloads = {p["symbol"]: p for p in payloads}
+    if not payloads:
+        return {}
+    loaded = load_ships(session, payloads)
+    ship_ids = write_ships(session, agent_id, payloads, loaded, overrides)
+    write_components(session, ship_ids, payloads, loaded)
+    for model in CHILDREN:
+        write_children(session, model, ship_ids, payloads)
+    write_telemetry(session, ship_ids, payloads)
+    session.flush()
+    return ship_ids
+
+
+def sync_ship_parts(session, ship_symbol, payload, models):
+    """Writes only `models` (components, Module/Mount and/or ShipStateSample) of one
+    ship already in the DB; returns False if it is not."""
+    loaded = load_ships(session, [ship_symbol])
+    if ship_symbol not in loaded:
+        return False
+    ship_ids, payloads = {ship_symbol: loaded[ship_symbol][0].id}, {
+        ship_symbol: payload
+    }
+    write_components(
+        session, ship_ids, payloads, loaded, [m for m in models if m in COMPONENTS]
+    )
+    for model in models:
+        if model in CHILDREN:
+            write_children(session, model, ship_ids, payloads)
+    if ShipStateSample in models:
+        write_telemetry(session, ship_ids, payloads)
+    session.flush()
+    return True
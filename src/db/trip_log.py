@@ -0,0 +1,63 @@
+from datetime import datetime
+import math
+from src.db.models import Ship, ShipEngine, ShipFrame, ShipTrip
+
+
+def _timestamp(value):
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+def trip_row(navigate_response, engine_speed):
+    """Maps a /navigate response to a ship_trips row (without ship/engine ids), or None."""
+    data = (navigate_response or {}).get("data") or {}
+    nav, fuel = data.get("nav") or {}, data.get("fuel") or {}
+    route = nav.get("route") or {}
+    origin, destination = route.get("origin"), route.get("destination")
+    if not origin or not destination or not route.get("arrival"):
+        return None
+
+    departed_at = _timestamp(route["departureTime"])
+    arrived_at = _timestamp(route["arrival"])
+    return {
+        "system_symbol": nav.get("systemSymbol", destination.get("systemSymbol")),
+        "origin_waypoint": origin["symbol"],
+        "destination_waypoint": destination["symbol"],
+        "distance": math.hypot(
+            destination["x"] - origin["x"], destination["y"] - origin["y"]
+        ),
+        "flight_mode": nav.get("flightMode", "CRUISE"),
+        "engine_speed": engine_speed,
+        "fuel_consumed": (fuel.get("consumed") or {}).get("amount", 0),
+        "fuel_after": fuel.get("current", 0),
+        "duration_seconds": (arrived_at - departed_at).total_seconds(),
+        "departed_at": departed_at,
+        "arrived_at": arrived_at,
+    }
+
+
+def record_trip(session, ship_symbol, navigate_response, engine_speed):
+    """Appends one ship_trips row for a navigate response; returns False if not loggable."""
+    row = trip_row(navigate_response, engine_speed)
+    if row is None:
+        return False
+
+    ship = (
+        session.query(Ship.id, ShipEngine.symbol, ShipFrame.symbol)
+        .outerjoin(ShipEngine, ShipEngine.ship_id == Ship.id)
+        .outerjoin(ShipFrame, ShipFrame.ship_id == Ship.id)
+        .filter(Ship.symbol == ship_symbol)
+        .first()
+    )
+    if ship is None:
+        return False
+
+    ship_id, engine_symbol, frame_symbol = ship
+    session.add(
+        ShipTrip(
+            ship_id=ship_id,
+            engine_symbol=engine_symbol,
+            frame_symbol=frame_symbol,
+            **row,
+        )
+    )
+    return True
@@ -13,27 +13,87 @@ async def handle_travel_event(event):
     destination_waypoint = event["destination_waypoint"]
     ship_symbol = event["ship_symbol"]
 
-    player = Player(agent_token=player_token)
-    ship = SpaceShip.load_or_create(player=player, shipSymbol=ship_symbol)
+    # DB work is blocking, so it runs in a worker thread to keep the loop free.
+    player = await asyncio.to_thread(Player, agent_token=player_token)
+    ship = await asyncio.to_thread(
+        SpaceShip.load_or_create, player=player, shipSymbol=ship_symbol
+    )
     if ship.waypointSymbol == destination_waypoint:
         logger.info("You are already at that location")
         return
     if ship.status == "DOCKED":
         logger.info("Going to Orbit")
-        ship.get_in_orbit()
+        await ship.get_in_orbit_async()
     if ship.status == "IN_TRANSIT":
         logger.info(
             "Ship is already in transit. Please wait until the current travel is complete."
         )
         return
 
-    ship.save_to_db()
+    await ship.save_to_db_async()
+
+    destination_system = _system_of(destination_waypoint)
+    if destination_system != ship.systemSymbol:
+        # Inter-system legs are not flown automatically yet; log the planned chain
+        # and hand the request to the API as is.
+        try:
+            system_route = await asyncio.to_thread(
+                ship.plan_system_route, destination_system
+            )
+        except Exception as e:
+            logger.warning(f"Could not plan a route to {destination_system}: {e}")
+            system_route = None
+        if system_route:
+            logger.info(
+                f"System route to {destination_system}: "
+                + " -> ".join(
+                    f"{leg['to']} ({leg['kind']})" for leg in system_route["legs"]
+                )
+            )
+        await _fly(ship, destination_waypoint)
+        return
+
+    try:
+        route = await asyncio.to_thread(
+            ship.plan_route, destination_waypoint, event.get("objective", "fastest")
+        )
+    except Exception as e:
+        logger.warning(f"Could not plan a route to {destination_waypoint}: {e}")
+        route = None
+    if route is None:
+        # Unknown waypoint, uncrawled system or nothing within fuel range: leave
+        # it to the API, as before route planning.
+        logger.warning(
+            f"No planned route from {ship.waypointSymbol} to {destination_waypoint} "
+            f"for {ship.shipSymbol}; flying directly."
+        )
+        await _fly(ship, destination_waypoint)
+        return
+    logger.info(
+        f"Route to {destination_waypoint}: {len(route['legs'])} legs, "
+        f"{route['total_fuel']} fuel, ~{route['total_time']}s"
+    )
+
+    if route["refuel_at_origin"] and route["legs"]:
+        await _refuel(ship)
+    for leg in route["legs"]:
+        if leg["flight_mode"] != ship.flightMode:
+            await ship.change_flight_mode_async(leg["flight_mode"])
+            ship.flightMode = leg["flight_mode"]
+        if not await _fly(ship, leg["to"]):
+            return
+        if leg["refuel_after"]:
+            await _refuel(ship)
 
-    ##api call
-    logger.info(f"Initiating travel to {destination_waypoint}...")
-    response = ship.travel_to_waypoint(destination_waypoint)
-    if response:
-        ship.status = "IN_TRANSIT"
+
+async def _fly(ship, waypoint):
+    """Navigates to one waypoint and waits for the ship to arrive."""
+    logger.info(f"Initiating travel to {waypoint}...")
+    response = await ship.travel_to_waypoint_async(waypoint)
+    if not response:
+        logger.error(f"Travel request for {ship.shipSymbol} failed.")
+        return False
+    ship.status = "IN_TRANSIT"
 
     logger.info("Event received in handler")
 
@@ -47,8 +107,37 @@ async def handle_travel_event(event):
     departure_dt = datetime.fromisoformat(departure_time.replace("Z", "+00:00"))
     travel_duration = (arrival_dt - departure_dt).total_seconds()
 
+    await asyncio.to_thread(_save_route, ship.shipSymbol, response)
+
+    logger.info(f"Sleeping for {travel_duration} seconds to simulate travel...")
+    print(f"ship status during trip is {ship.status}")
+    await asyncio.sleep(travel_duration)
+    await ship.refresh_async()
+    print(f"ship status after trip is {ship.status}")
+    logger.info(f"{ship.shipSymbol} has reached {ship.waypointSymbol}")
+    return True
+
+
+async def _refuel(ship):
+    await ship.dock_async()
+    await ship.refuel_async()
+    await ship.get_in_orbit_async()
+    logger.info(f"{ship.shipSymbol} refueled at {ship.waypointSymbol}")
+
+
+def _system_of(waypoint_symbol):
+    return "-".join(waypoint_symbol.split("-")[:2])
+
+
+def _save_route(ship_symbol, response):
+    arrival_time = (
+        response.get("data", {}).get("nav", {}).get("route", {}).get("arrival")
+    )
+    departure_time = (
+        response.get("data", {}).get("nav", {}).get("route", {}).get("departureTime")
+    )
     with get_session() as session:
-        ship_db = session.query(Ship).filter(Ship.symbol == ship.shipSymbol).first()
+        ship_db = session.query(Ship).filter(Ship.symbol == ship_symbol).first()
         shipnav = (
             session.query(ShipNavigation)
             .filter(ShipNavigation.ship_id == ship_db.id)
@@ -63,11 +152,3 @@ async def handle_travel_event(event):
             response.get("data", {}).get("nav", {}).get("waypointSymbol", {})
         )
         session.commit()
-
-    logger.info(f"Sleeping for {travel_duration} seconds to simulate travel...")
-    print(f"ship status during trip is {ship.status}")
-    await asyncio.sleep(travel_duration)
-    ship.update_from_api()
-    ship.save_to_db()
-    print(f"ship status after trip is {ship.status}")
-    logger.info(f"{ship.shipSymbol} has reached {ship.waypointSymbol}")
@@ -26,22 +26,3 @@ ship2 = SpaceShip.load_or_create(
 )
 print(ship)
 print(ship2)
-# nav = ship.fetch_navigation_info_from_db()
-# origin_system = nav["origin_system"]
-
-# sol = SolSystem(origin_system)
-# waypoints = sol.get_waypoints()
-
-# # Calculate distances to all waypoints
-# distances = []
-# for wp in waypoints:
-#     waypoint_symbol = wp["waypoint_symbol"]
-#     distance = ship.get_distance_to_waypoint(destination_waypoint=waypoint_symbol)
-#     distances.append((waypoint_symbol, distance))
-
-# # Sort by distance
-# sorted_distances = sorted(distances, key=lambda x: x[1])
-
-# # Pretty print
-# for symbol, dist in sorted_distances:
-#     print(f"{symbol}: {dist:.2f} units")
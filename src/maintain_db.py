@@ -0,0 +1,5 @@
+from src.db import price_history, ship_history
+
+# Run periodically (e.g. daily cron) to keep the append-only history tables small.
+price_history.rollup_and_prune()
+ship_history.rollup_and_prune()
@@ -0,0 +1,56 @@
+import threading
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+import joblib
+from src.utils.logger import logger
+
+ARTIFACT_DIR = Path(__file__).resolve().parent / "artifacts"
+ARTIFACT_MAX_AGE = timedelta(hours=24)
+
+
+def save_artifact(predictor, path, version):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    joblib.dump({"version": version, "predictor": predictor}, path)
+    logger.info(f"{type(predictor).__name__} saved to {path}.")
+
+
+def load_artifact(path, version, max_age=ARTIFACT_MAX_AGE):
+    """Returns the saved predictor, or None if missing, stale or incompatible."""
+    if not path.exists():
+        return None
+    artifact = joblib.load(path)
+    predictor = artifact.get("predictor")
+    if artifact.get("version") != version or predictor is None:
+        return None
+    if max_age and datetime.now(timezone.utc) - predictor.trained_at > max_age:
+        return None
+    return predictor
+
+
+class CachedPredictor:
+    """Process-wide predictor: loaded from its artifact, or trained by `train()` and
+    saved when the artifact is missing or older than max_age."""
+
+    def __init__(self, path, version, train) -> None:
+        self.path = path
+        self.version = version
+        self.train = train
+        self._lock = threading.Lock()
+        self._predictor = None
+
+    def get(self, max_age=ARTIFACT_MAX_AGE):
+        """The cached predictor, or None while there is nothing to train on."""
+        with self._lock:
+            if self._predictor is None:
+                self._predictor = load_artifact(self.path, self.version, max_age)
+            if self._predictor is None:
+                predictor = self.train()
+                if not predictor.trained:
+                    return None
+                save_artifact(predictor, self.path, self.version)
+                self._predictor = predictor
+            return self._predictor
+
+    def invalidate(self):
+        with self._lock:
+            self._predictor = None
@@ -0,0 +1,162 @@
+from datetime import datetime, timedelta, timezone
+import numpy as np
+import pandas as pd
+from src.db.db_session import get_session
+from src.db.models import ShipTrip
+from src.ml.artifacts import (
+    ARTIFACT_DIR,
+    ARTIFACT_MAX_AGE,
+    CachedPredictor,
+    load_artifact,
+    save_artifact,
+)
+from src.objects.navigation import fuel_cost, travel_time
+from src.utils.logger import logger
+
+ARTIFACT_PATH = ARTIFACT_DIR / "fuel_predictor.joblib"
+MODEL_VERSION = 1
+MIN_SAMPLES = 5
+TRIP_COLUMNS = [
+    "distance",
+    "flight_mode",
+    "engine_symbol",
+    "engine_speed",
+    "fuel_consumed",
+    "duration_seconds",
+]
+
+
+def load_trips(days=90):
+    """Logged trips of the last `days` days as a DataFrame."""
+    since = datetime.now(timezone.utc) - timedelta(days=days)
+    with get_session() as session:
+        rows = (
+            session.query(*(getattr(ShipTrip, c) for c in TRIP_COLUMNS))
+            .filter(ShipTrip.departed_at >= since)
+            .all()
+        )
+    return pd.DataFrame(rows, columns=TRIP_COLUMNS)
+
+
+def _fit_line(x, y):
+    design = np.column_stack([x, np.ones(len(x))])
+    coef, *_ = np.linalg.lstsq(design, y, rcond=None)
+    return float(coef[0]), float(coef[1])
+
+
+class FuelPredictor:
+    """Per flight mode (and engine, when there is enough data) linear models.
+
+    fuel ~ a * distance + b and duration ~ c * distance / engine_speed + d, the same
+    shape as the game's formulas, so a least-squares fit is accurate and a prediction
+    is a few NumPy multiply-adds over whole arrays. Combinations without enough
+    trips fall back to the formulas in src.objects.navigation.
+    """
+
+    def __init__(self) -> None:
+        # (flight_mode, engine_symbol or None) -> (slope, intercept)
+        self.fuel_coef = {}
+        self.time_coef = {}
+        self.trained_at = None
+        self.training_rows = 0
+
+    @property
+    def trained(self):
+        return self.trained_at is not None
+
+    def fit(self, trips):
+        trips = trips[trips["distance"] > 0]
+        groups = [(mode, None) for mode in trips["flight_mode"].unique()]
+        groups += list(
+            trips[["flight_mode", "engine_symbol"]]
+            .dropna()
+            .drop_duplicates()
+            .itertuples(index=False, name=None)
+        )
+        for mode, engine in groups:
+            rows = trips[trips["flight_mode"] == mode]
+            if engine is not None:
+                rows = rows[rows["engine_symbol"] == engine]
+            if len(rows) < MIN_SAMPLES:
+                continue
+            distance = rows["distance"].to_numpy(np.float64)
+            speed = rows["engine_speed"].to_numpy(np.float64).clip(min=1)
+            self.fuel_coef[(mode, engine)] = _fit_line(
+                distance, rows["fuel_consumed"].to_numpy(np.float64)
+            )
+            self.time_coef[(mode, engine)] = _fit_line(
+                distance / speed, rows["duration_seconds"].to_numpy(np.float64)
+            )
+        self.trained_at = datetime.now(timezone.utc)
+        self.training_rows = len(trips)
+        logger.info(
+            f"Fuel predictor trained on {self.training_rows} trips, "
+            f"{len(self.fuel_coef)} mode/engine models."
+        )
+        return self
+
+    def _coef(self, table, flight_mode, engine_symbol):
+        coef = table.get((flight_mode, engine_symbol))
+        return coef if coef is not None else table.get((flight_mode, None))
+
+    def predict_fuel(self, distance, flight_mode="CRUISE", engine_symbol=None):
+        distance = np.asarray(distance, dtype=np.float64)
+        coef = self._coef(self.fuel_coef, flight_mode, engine_symbol)
+        if coef is None:
+            return fuel_cost(distance, flight_mode)
+        return np.maximum(np.round(coef[0] * distance + coef[1]), 1).astype(np.int64)
+
+    def predict_time(
+        self, distance, engine_speed, flight_mode="CRUISE", engine_symbol=None
+    ):
+        distance = np.asarray(distance, dtype=np.float64)
+        coef = self._coef(self.time_coef, flight_mode, engine_symbol)
+        if coef is None:
+            return travel_time(distance, engine_speed, flight_mode)
+        seconds = np.round(coef[0] * distance / max(engine_speed, 1) + coef[1])
+        return np.maximum(seconds, 1).astype(np.int64)
+
+    def predict(self, trips):
+        """Predicts fuel and duration for a frame of candidate trips with mixed modes."""
+        fuel = np.zeros(len(trips), dtype=np.int64)
+        seconds = np.zeros(len(trips), dtype=np.int64)
+        engines = (
+            trips["engine_symbol"]
+            if "engine_symbol" in trips
+            else pd.Series(None, index=trips.index, dtype=object)
+        )
+        keys = pd.DataFrame(
+            {
+                "flight_mode": trips["flight_mode"].to_numpy(),
+                "engine_symbol": engines.to_numpy(),
+                "engine_speed": trips["engine_speed"].to_numpy(),
+            }
+        )
+        for (mode, engine, speed), rows in keys.groupby(
+            ["flight_mode", "engine_symbol", "engine_speed"], dropna=False
+        ).indices.items():
+            engine = None if pd.isna(engine) else engine
+            distance = trips["distance"].to_numpy(np.float64)[rows]
+            fuel[rows] = self.predict_fuel(distance, mode, engine)
+            seconds[rows] = self.predict_time(distance, speed, mode, engine)
+        return pd.DataFrame(
+            {"fuel": fuel, "duration_seconds": seconds}, index=trips.index
+        )
+
+    def save(self, path=ARTIFACT_PATH):
+        save_artifact(self, path, MODEL_VERSION)
+
+    @classmethod
+    def load(cls, path=ARTIFACT_PATH, max_age=ARTIFACT_MAX_AGE):
+        """Returns the cached predictor, or None if missing, stale or incompatible."""
+        return load_artifact(path, MODEL_VERSION, max_age)
+
+
+_cache = CachedPredictor(
+    ARTIFACT_PATH, MODEL_VERSION, lambda: FuelPredictor().fit(load_trips())
+)
+
+
+def get_fuel_predictor(max_age=ARTIFACT_MAX_AGE):
+    """Loads the predictor artifact, training and caching a new one only if needed."""
+    return _cache.get(max_age)
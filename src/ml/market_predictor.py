@@ -0,0 +1,160 @@
+from datetime import datetime, timedelta, timezone
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import HistGradientBoostingRegressor
+from src.db.db_session import get_session
+from src.db.models import MarketPriceObservation
+from src.db.price_history import RAW_RETENTION_DAYS
+from src.ml.artifacts import (
+    ARTIFACT_DIR,
+    ARTIFACT_MAX_AGE,
+    CachedPredictor,
+    load_artifact,
+    save_artifact,
+)
+from src.utils.logger import logger
+
+ARTIFACT_PATH = ARTIFACT_DIR / "market_predictor.joblib"
+MODEL_VERSION = 1
+
+KEY = ["waypoint_id", "product_symbol"]
+FEATURES = [
+    "purchase_price",
+    "sell_price",
+    "trade_volume",
+    "supply",
+    "activity",
+    "spread",
+    "purchase_change_1",
+    "sell_change_1",
+    "purchase_change_3",
+    "sell_change_3",
+    "seconds_since_last",
+    "observations",
+]
+TARGETS = {"purchase_price": "next_purchase_change", "sell_price": "next_sell_change"}
+
+
+def load_price_history(days=RAW_RETENTION_DAYS):
+    """Raw price observations of the last `days` days, ordered per (waypoint, good)."""
+    since = datetime.now(timezone.utc) - timedelta(days=days)
+    columns = [
+        "waypoint_id",
+        "product_symbol",
+        "observed_at",
+        "purchase_price",
+        "sell_price",
+        "trade_volume",
+        "supply",
+        "activity",
+    ]
+    with get_session() as session:
+        rows = (
+            session.query(*(getattr(MarketPriceObservation, c) for c in columns))
+            .filter(MarketPriceObservation.observed_at >= since)
+            .order_by(
+                MarketPriceObservation.waypoint_id,
+                MarketPriceObservation.product_symbol,
+                MarketPriceObservation.observed_at,
+            )
+            .all()
+        )
+    return pd.DataFrame(rows, columns=columns)
+
+
+def build_features(history):
+    """Adds lag/change features and next-observation targets, all with grouped shifts.
+
+    Prices are modelled as relative changes so one model serves goods of very
+    different price levels.
+    """
+    df = history.sort_values(KEY + ["observed_at"], kind="stable").reset_index(
+        drop=True
+    )
+    groups = df.groupby(KEY, sort=False)
+    for price, short in (("purchase_price", "purchase"), ("sell_price", "sell")):
+        # A price of 0 means "not listed"; as NaN it never becomes a +-inf change.
+        current = df[price].astype(np.float64).replace(0, np.nan)
+        shifted = current.groupby([df[k] for k in KEY], sort=False)
+        for lag in (1, 3):
+            df[f"{short}_change_{lag}"] = current / shifted.shift(lag) - 1
+        df[f"next_{short}_change"] = shifted.shift(-1) / current - 1
+    df["spread"] = df["sell_price"] / df["purchase_price"].replace(0, np.nan) - 1
+    df["seconds_since_last"] = (
+        groups["observed_at"].diff().dt.total_seconds().astype(np.float64)
+    )
+    df["observations"] = groups.cumcount()
+    return df
+
+
+class MarketPricePredictor:
+    """Forecasts the next observed purchase/sell price of every (waypoint, good)."""
+
+    def __init__(self, max_iter=200) -> None:
+        self.models = {
+            price: HistGradientBoostingRegressor(max_iter=max_iter) for price in TARGETS
+        }
+        self.trained_at = None
+        self.training_rows = {}  # price -> rows its model was fitted on
+
+    @property
+    def trained(self):
+        return self.trained_at is not None
+
+    def fit(self, history):
+        """Fits one model per price; stays untrained if any target has no rows yet
+        (e.g. a fresh DB with fewer than two observations per market-good pair)."""
+        features = build_features(history)
+        targets = {
+            price: features[features[target].notna()]
+            for price, target in TARGETS.items()
+        }
+        if any(rows.empty for rows in targets.values()):
+            logger.warning("Not enough price history to train the market predictor.")
+            return self
+        for price, rows in targets.items():
+            self.models[price].fit(rows[FEATURES], rows[TARGETS[price]])
+            self.training_rows[price] = len(rows)
+        self.trained_at = datetime.now(timezone.utc)
+        logger.info(f"Market predictor trained on {self.training_rows} observations.")
+        return self
+
+    def predict(self, features):
+        """Scores every row of a feature frame in one call per target."""
+        result = features[KEY].copy()
+        for price in TARGETS:
+            change = self.models[price].predict(features[FEATURES])
+            result[f"predicted_{price}"] = np.round(
+                features[price].to_numpy() * (1 + change)
+            ).astype(np.int64)
+        return result.reset_index(drop=True)
+
+    def predict_latest(self, history=None):
+        """Predicts the next price of every market-good pair from its latest observation."""
+        history = history if history is not None else load_price_history()
+        features = build_features(history)
+        latest = features.groupby(KEY, sort=False).tail(1)
+        return self.predict(latest)
+
+    def save(self, path=ARTIFACT_PATH):
+        save_artifact(self, path, MODEL_VERSION)
+
+    @classmethod
+    def load(cls, path=ARTIFACT_PATH, max_age=ARTIFACT_MAX_AGE):
+        """Returns the cached predictor, or None if missing, stale or incompatible."""
+        return load_artifact(path, MODEL_VERSION, max_age)
+
+
+_cache = CachedPredictor(
+    ARTIFACT_PATH,
+    MODEL_VERSION,
+    lambda: MarketPricePredictor().fit(load_price_history()),
+)
+
+
+def get_market_predictor(max_age=ARTIFACT_MAX_AGE):
+    """Loads the predictor artifact, training and caching a new one only if needed.
+
+    Returns None while there is not enough price history to train on.
+    """
+    return _cache.get(max_age)
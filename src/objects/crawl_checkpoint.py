@@ -0,0 +1,131 @@
+import hashlib
+import json
+import time
+from datetime import datetime, timezone
+from src.db.db_session import get_session
+from src.db.models import CrawlCheckpoint
+from src.utils.logger import logger
+
+# Checkpoint writes rewrite the whole page list, so they are batched: an interrupted
+# crawl re-fetches at most this many pages (or seconds' worth of pages).
+SAVE_EVERY_PAGES = 25
+SAVE_INTERVAL = 30  # seconds
+
+
+class CrawlProgress:
+    """Persists which /systems pages have been stored so a crawl can resume or run as a delta.
+
+    - An interrupted crawl resumes with only the pages it has not stored yet.
+    - A finished crawl refreshed later only fetches the pages from the previous last page
+      onwards (new systems are appended to the end of the listing).
+    - A page whose payload hash matches the last stored one is not written again.
+    """
+
+    def __init__(self, name="systems", limit=20) -> None:
+        self.name = name
+        self.limit = limit
+        self.completed = set()
+        self.page_hashes = {}
+        self.previous_total = 0
+        self.previous_pages = 0
+        self.was_finished = False
+        self._unsaved = 0
+        self._saved_at = time.monotonic()
+        self._load()
+
+    def _load(self):
+        with get_session() as session:
+            row = session.query(CrawlCheckpoint).filter_by(name=self.name).first()
+            if not row:
+                return
+            if row.page_limit != self.limit:
+                logger.info(
+                    f"Checkpoint '{self.name}' used page size {row.page_limit}, "
+                    f"starting a full crawl with page size {self.limit}."
+                )
+                return
+            self.completed = set(row.completed_pages or [])
+            self.page_hashes = dict(row.page_hashes or {})
+            self.previous_total = row.total_systems
+            self.previous_pages = row.total_pages
+            self.was_finished = row.completed_at is not None
+
+    def plan(self, total_pages, total_systems, full=False):
+        """Returns the pages that still need to be fetched for this run."""
+        if full or not (self.completed or self.was_finished):
+            self.completed = set()
+            pages = list(range(1, total_pages + 1))
+        elif self.was_finished:
+            # Only the previously partial last page and anything after it can change.
+            first_changed = max(self.previous_pages, 1)
+            if total_systems == self.previous_total:
+                first_changed = total_pages + 1
+            self.completed = set(range(1, first_changed))
+            pages = list(range(first_changed, total_pages + 1))
+        else:
+            pages = [p for p in range(1, total_pages + 1) if p not in self.completed]
+            logger.info(
+                f"Resuming crawl '{self.name}': {len(self.completed)} pages already stored, "
+                f"{len(pages)} remaining."
+            )
+
+        self._save(total_pages, total_systems, started=True)
+        return pages
+
+    @staticmethod
+    def page_hash(systems):
+        return hashlib.sha1(json.dumps(systems, sort_keys=True).encode()).hexdigest()
+
+    def is_unchanged(self, page, digest):
+        return self.page_hashes.get(str(page)) == digest
+
+    def mark_done(self, page, digest):
+        self.completed.add(page)
+        self.page_hashes[str(page)] = digest
+        self._unsaved += 1
+        if (
+            self._unsaved >= SAVE_EVERY_PAGES
+            or time.monotonic() - self._saved_at >= SAVE_INTERVAL
+        ):
+            self.flush()
+
+    def flush(self):
+        """Writes pages marked done since the last save."""
+        if self._unsaved:
+            self._save()
+
+    def finish(self, total_pages, failed_pages):
+        self._save(total_pages, finished=not failed_pages)
+
+    @property
+    def last_completed_page(self):
+        page = 0
+        while page + 1 in self.completed:
+            page += 1
+        return page
+
+    def _save(
+        self, total_pages=None, total_systems=None, started=False, finished=False
+    ):
+        now = datetime.now(timezone.utc)
+        self._unsaved = 0
+        self._saved_at = time.monotonic()
+        with get_session() as session:
+            row = session.query(CrawlCheckpoint).filter_by(name=self.name).first()
+            if not row:
+                row = CrawlCheckpoint(name=self.name, page_limit=self.limit)
+                session.add(row)
+            row.page_limit = self.limit
+            row.completed_pages = sorted(self.completed)
+            row.last_completed_page = self.last_completed_page
+            row.page_hashes = dict(self.page_hashes)
+            if total_pages is not None:
+                row.total_pages = total_pages
+            if total_systems is not None:
+                row.total_systems = total_systems
+            if started:
+                row.started_at = now
+                row.completed_at = None
+            if finished:
+                row.completed_at = now
+                self.was_finished = True
@@ -0,0 +1,113 @@
+import threading
+import numpy as np
+from geoalchemy2.functions import ST_X, ST_Y
+from src.db.db_session import get_session
+from src.db.models import System, Waypoint
+from src.objects.navigation import fuel_cost, travel_time, zero_diagonal
+from src.objects.spatial_index import current_spatial_index
+from src.objects.universe_catalog import current_universe_catalog
+
+
+class WaypointDistanceMatrix:
+    """All waypoint-to-waypoint distances of one system as a dense NumPy matrix."""
+
+    def __init__(self, system_symbol, symbols, xy) -> None:
+        self.system_symbol = system_symbol
+        self.symbols = np.asarray(symbols, dtype=object)
+        self.xy = np.asarray(xy, dtype=np.float64).reshape(-1, 2)
+        self.position = {s: i for i, s in enumerate(self.symbols)}
+        delta = self.xy[:, None, :] - self.xy[None, :, :]
+        self.distances = np.hypot(delta[..., 0], delta[..., 1])
+
+    @classmethod
+    def load(cls, system_symbol):
+        """Builds the matrix from the spatial index if enabled, else the universe
+        snapshot if one exists, else with one DB read."""
+        index = current_spatial_index()
+        if index and index.has_system(system_symbol):
+            symbols, xy = index.waypoints_of(system_symbol)
+            return cls(system_symbol, symbols, xy)
+        catalog = current_universe_catalog()
+        waypoints = catalog.waypoint_arrays(system_symbol) if catalog else None
+        if waypoints is not None:
+            return cls(system_symbol, *waypoints)
+
+        with get_session() as session:
+            rows = (
+                session.query(
+                    Waypoint.waypoint_symbol,
+                    ST_X(Waypoint.waypoint_location),
+                    ST_Y(Waypoint.waypoint_location),
+                )
+                .join(System, Waypoint.system_id == System.id)
+                .filter(System.symbol == system_symbol)
+                .order_by(Waypoint.waypoint_symbol)
+                .all()
+            )
+        return cls(system_symbol, [r[0] for r in rows], [(r[1], r[2]) for r in rows])
+
+    def __len__(self):
+        return len(self.symbols)
+
+    def index_of(self, waypoint_symbol):
+        try:
+            return self.position[waypoint_symbol]
+        except KeyError:
+            raise ValueError(
+                f"Waypoint {waypoint_symbol} not found in {self.system_symbol}."
+            )
+
+    def distance(self, a, b):
+        return float(self.distances[self.index_of(a), self.index_of(b)])
+
+    def distances_from(self, waypoint_symbol):
+        return self.distances[self.index_of(waypoint_symbol)]
+
+    def fuel_matrix(self, flight_mode="CRUISE"):
+        return zero_diagonal(fuel_cost(self.distances, flight_mode))
+
+    def time_matrix(self, engine_speed, flight_mode="CRUISE"):
+        return zero_diagonal(travel_time(self.distances, engine_speed, flight_mode))
+
+    def rank_destinations(
+        self, origin, engine_speed, flight_mode="CRUISE", sort_by="distance"
+    ):
+        """Ranks every other waypoint from `origin`; sort_by is distance, fuel or time."""
+        distances = self.distances_from(origin)
+        fuel = fuel_cost(distances, flight_mode)
+        seconds = travel_time(distances, engine_speed, flight_mode)
+        key = {"distance": distances, "fuel": fuel, "time": seconds}[sort_by]
+        origin_i = self.index_of(origin)
+        return [
+            {
+                "waypoint_symbol": self.symbols[i],
+                "distance": float(distances[i]),
+                "fuel": int(fuel[i]),
+                "time": int(seconds[i]),
+            }
+            for i in np.argsort(key, kind="stable")
+            if i != origin_i
+        ]
+
+
+_lock = threading.Lock()
+_matrices = {}
+
+
+def get_distance_matrix(system_symbol):
+    """Returns the cached distance matrix of a system, loading it on first use."""
+    matrix = _matrices.get(system_symbol)
+    if matrix is None:
+        matrix = WaypointDistanceMatrix.load(system_symbol)
+        with _lock:
+            _matrices[system_symbol] = matrix
+    return matrix
+
+
+def invalidate_distance_matrices(system_symbols=None):
+    with _lock:
+        if system_symbols is None:
+            _matrices.clear()
+        else:
+            for symbol in system_symbols:
+                _matrices.pop(symbol, None)
@@ -1,13 +1,23 @@
-import math
 import time
 from sqlalchemy.exc import IntegrityError
 from geoalchemy2.shape import from_shape
 from shapely.geometry import Point
 
-from src.objects.ship import SpaceShip
-from src.objects.sol_system import SolSystem
+from src.objects.market_scanner import MarketScanner
+from src.bot.trade_routes import markets_refreshed
+from src.objects.spatial_index import invalidate_spatial_index
+from src.objects.universe_catalog import (
+    invalidate_universe_catalog,
+    rebuild_universe_snapshot,
+)
+from src.objects.distance_matrix import invalidate_distance_matrices
+from src.objects.system_graph import rebuild_warp_edges
+from src.objects.universe_crawler import UniverseCrawler, MAX_PAGE_LIMIT
+from src.objects.crawl_checkpoint import CrawlProgress
 from src.db.db_session import get_session
-from src.db.models import System, Waypoint, MarketTradeGoods, Ship
+from src.db.bulk import store_systems_bulk, upsert_market_goods
+from src.db.price_history import record_price_observations
+from src.db.models import System, Waypoint
 from src.utils.logger import logger
 
 
@@ -15,23 +25,55 @@ class Market:
     def __init__(self, player):
         self.player = player
 
-    def build_database(self, limit=10):
-        max_pages = self.get_max_pages(limit)
-        for page in range(1, max_pages + 1):
-            logger.info(f"Fetching page {page}/{max_pages}")
-            params = {"page": page, "limit": limit}
-            data = self.fetch_with_retries(params)
-
-            if data is None:
-                logger.error(f"API failed. Skipping page {page}.")
-                break
-
-            systems = data.get("data", [])
-            if not systems:
-                logger.warning(f"No systems found on page {page}. Stopping.")
-                break
-
-            self.store_systems_and_waypoints(systems)
+    def build_database(self, limit=MAX_PAGE_LIMIT, workers=4, queue_size=8, full=False):
+        """Crawls /systems pages concurrently and stores systems and waypoints.
+
+        Pages are fetched by `workers` threads within the agent's rate budget and
+        written one at a time as they arrive. Progress is checkpointed in batches, so
+        an interrupted crawl resumes where it stopped and a later refresh only
+        fetches the tail of the listing; pass full=True to re-crawl everything.
+        Returns the crawl statistics.
+        """
+        limit = min(limit, MAX_PAGE_LIMIT)
+        progress = CrawlProgress("systems", limit=limit)
+        written = []
+
+        def store_page(page, systems):
+            digest = progress.page_hash(systems)
+            if progress.is_unchanged(page, digest):
+                logger.info(f"Page {page} unchanged since last crawl, skipping write.")
+            else:
+                # Derived caches are refreshed once after the crawl, not per page.
+                self.store_systems_and_waypoints(systems, invalidate=False)
+                written.append(page)
+            progress.mark_done(page, digest)
+
+        crawler = UniverseCrawler(
+            fetch_page=self.fetch_with_retries,
+            store_page=store_page,
+            limit=limit,
+            workers=workers,
+            queue_size=queue_size,
+        )
+        try:
+            stats = crawler.crawl(
+                pages=lambda total_pages, total_systems: progress.plan(
+                    total_pages, total_systems, full=full
+                )
+            )
+        except BaseException:
+            progress.flush()  # keep the stored pages for the resume
+            if written:
+                self.universe_changed()
+            raise
+        if stats["total_pages"]:
+            progress.finish(stats["total_pages"], stats["failed_pages"])
+        if written:
+            rebuild_universe_snapshot()
+            invalidate_spatial_index()
+            invalidate_distance_matrices()
+            rebuild_warp_edges()
+        return stats
 
     def fetch_with_retries(self, params, max_retries=3):
         for attempt in range(1, max_retries + 1):
@@ -47,21 +89,29 @@ class Market:
         logger.error("API failed after maximum retries.")
         return None
 
-    def get_max_pages(self, limit):
-        try:
-            response = self.player.view_all_systems()
-            total = response.get("meta", {}).get("total", 0)
-            return math.ceil(total / limit) if total > 0 else 1
-        except Exception as e:
-            logger.error(f"Failed to get max pages: {e}")
-            return 1
-
-    def store_systems_and_waypoints(self, systems):
+    def store_systems_and_waypoints(self, systems, bulk=True, invalidate=True):
+        """Stores one page of systems; bulk=False uses the per-row ORM path.
+
+        invalidate=False leaves the universe caches alone, for callers storing many
+        pages that call universe_changed() once at the end.
+        """
         with get_session() as session:
-            system_map = self.insert_systems(systems, session)
-            waypoint_map = self.insert_waypoints(systems, session, system_map)
-            self.link_parent_waypoints(systems, session, waypoint_map)
+            if bulk:
+                store_systems_bulk(session, systems)
+            else:
+                system_map = self.insert_systems(systems, session)
+                waypoint_map = self.insert_waypoints(systems, session, system_map)
+                self.link_parent_waypoints(systems, session, waypoint_map)
             logger.info("All systems and waypoints stored successfully.")
+        if invalidate:
+            self.universe_changed()
+
+    @staticmethod
+    def universe_changed():
+        """Drops the catalog, spatial index and distance matrices built from systems."""
+        invalidate_universe_catalog()
+        invalidate_spatial_index()
+        invalidate_distance_matrices()
 
     def insert_systems(self, systems, session):
         system_map = {}
@@ -139,95 +189,38 @@ class Market:
             return "HIGH"
         return "VERY_HIGH"
 
+    def market_goods_rows(self, market_json, ship_id: int, waypoint_id: int):
+        """Flattens a /market response into market_trade_goods rows."""
+        rows = []
+        for item in market_json.get("data", {}).get("tradeGoods", []):
+            purchase_price = item.get("purchasePrice", 0)
+            sell_price = item.get("sellPrice", 0)
+            rows.append(
+                {
+                    "ship_id": ship_id,
+                    "waypoint_id": waypoint_id,
+                    "product_symbol": item.get("symbol", "UNKNOWN"),
+                    "trade_volume": item.get("tradeVolume", 0),
+                    "type": item.get("type", "UNKNOWN"),
+                    "supply": item.get("supply", "UNKNOWN"),
+                    "activity": item.get("activity", "UNKNOWN"),
+                    "purchase_price": purchase_price,
+                    "sell_price": sell_price,
+                    "demand": self.classify_demand(sell_price, purchase_price),
+                }
+            )
+        return rows
+
     def save_local_market_to_db(
         self, market_json, ship_id: int, waypoint_id: int
     ) -> None:
-        trade_goods = market_json.get("data", {}).get("tradeGoods", [])
+        rows = self.market_goods_rows(market_json, ship_id, waypoint_id)
         with get_session() as session:
-            for item in trade_goods:
-                symbol = item.get("symbol", "UNKNOWN")
-                entry = (
-                    session.query(MarketTradeGoods)
-                    .filter_by(
-                        ship_id=ship_id, waypoint_id=waypoint_id, product_symbol=symbol
-                    )
-                    .first()
-                )
-
-                if entry:
-                    entry.trade_volume = item.get("tradeVolume", "UNKNOWN")
-                    entry.type = item.get("type", "UNKNOWN")
-                    entry.supply = item.get("supply", "UNKNOWN")
-                    entry.activity = item.get("activity", "UNKNOWN")
-                    entry.purchase_price = item.get("purchasePrice", "UNKNOWN")
-                    entry.sell_price = item.get("sellPrice", "UNKNOWN")
-                    entry.demand = self.classify_demand(
-                        entry.sell_price, entry.purchase_price
-                    )
-                else:
-                    new_entry = MarketTradeGoods(
-                        ship_id=ship_id,
-                        waypoint_id=waypoint_id,
-                        product_symbol=symbol,
-                        trade_volume=item.get("tradeVolume", "UNKNOWN"),
-                        type=item.get("type", "UNKNOWN"),
-                        supply=item.get("supply", "UNKNOWN"),
-                        activity=item.get("activity", "UNKNOWN"),
-                        purchase_price=item.get("purchasePrice", "UNKNOWN"),
-                        sell_price=item.get("sellPrice", "UNKNOWN"),
-                        demand=self.classify_demand(
-                            item.get("sellPrice", 0), item.get("purchasePrice", 0)
-                        ),
-                    )
-                    session.add(new_entry)
-
-            session.commit()
-
-    def build_local_market(self, ship_symbols=None):
-        if not ship_symbols:
-            ship_symbols = self.player.shipSymbols
-
-        for ship_symbol in ship_symbols:
-            curr_ship = SpaceShip(self.player, ship_symbol)
-            ship_origin_system = curr_ship.waypointSymbol
-            sol = SolSystem(ship_origin_system)
-            neighbors = sol.get_neighbors_within_radius(radius=1000)
-
-            with get_session() as session:
-                ship_record = session.query(Ship).filter_by(symbol=ship_symbol).first()
-                for curr_system in neighbors:
-                    system_symbol = (
-                        curr_system["symbol"]
-                        if isinstance(curr_system, dict)
-                        else curr_system
-                    )
-                    system = (
-                        session.query(System).filter_by(symbol=system_symbol).first()
-                    )
-
-                    if not system:
-                        logger.warning(f"No system found with symbol {system_symbol}")
-                        continue
-
-                    waypoints = (
-                        session.query(Waypoint).filter_by(system_id=system.id).all()
-                    )
-                    for wp in waypoints:
-                        try:
-                            market_data = self.player.fetch_market_data(
-                                wp.waypoint_symbol
-                            )
-                            if market_data:
-                                self.save_local_market_to_db(
-                                    market_json=market_data,
-                                    ship_id=ship_record.id,
-                                    waypoint_id=wp.id,
-                                )
-                            else:
-                                logger.warning(
-                                    f"Market data unavailable for {wp.waypoint_symbol} in {system_symbol}"
-                                )
-                        except Exception as e:
-                            logger.error(
-                                f"Exception fetching market data for {wp.waypoint_symbol} in {system_symbol}: {e}"
-                            )
+            record_price_observations(session, rows)
+            upsert_market_goods(session, rows)
+        markets_refreshed([waypoint_id])
+
+    def build_local_market(self, ship_symbols=None, radius=1000, workers=8):
+        """Refreshes every marketplace within `radius` of the given ships (all by default)."""
+        scanner = MarketScanner(self, radius=radius, workers=workers)
+        return scanner.scan(ship_symbols)
@@ -0,0 +1,171 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from src.bot.trade_routes import markets_refreshed
+from src.db.bulk import upsert_market_goods
+from src.db.price_history import record_price_observations
+from src.db.db_session import get_session
+from src.db.models import Ship, Waypoint
+from src.objects.sol_system import SolSystem
+from src.objects.universe_catalog import get_universe_catalog
+from src.utils.logger import logger
+
+MARKETPLACE_TRAIT = "MARKETPLACE"
+MARKETPLACE_CACHE_TTL = 6 * 3600  # marketplaces practically never appear or vanish
+
+_marketplace_lock = threading.Lock()
+_marketplace_cache = {}  # system symbol -> (expires_at, frozenset of waypoint symbols)
+
+
+def cached_marketplaces(player, system_symbol, ttl=MARKETPLACE_CACHE_TTL):
+    """Returns the waypoints of a system that have a MARKETPLACE, cached per process."""
+    now = time.monotonic()
+    with _marketplace_lock:
+        entry = _marketplace_cache.get(system_symbol)
+    if entry and entry[0] > now:
+        return entry[1]
+
+    waypoints = player.fetch_all_waypoints(system_symbol, MARKETPLACE_TRAIT)
+    if waypoints is None:
+        logger.warning(f"Could not list marketplaces in {system_symbol}.")
+        return frozenset()
+
+    symbols = frozenset(wp["symbol"] for wp in waypoints)
+    with _marketplace_lock:
+        _marketplace_cache[system_symbol] = (now + ttl, symbols)
+    return symbols
+
+
+def clear_marketplace_cache():
+    with _marketplace_lock:
+        _marketplace_cache.clear()
+
+
+class MarketScanner:
+    """Refreshes market data around the player's ships.
+
+    Only marketplace waypoints are queried; a waypoint inside several ships' radii is
+    fetched once. Markets are fetched concurrently (the shared rate limiter keeps the
+    agent inside its budget) and goods are upserted in batches.
+    """
+
+    def __init__(self, market, radius=1000, workers=8, batch_size=25) -> None:
+        self.market = market
+        self.player = market.player
+        self.radius = radius
+        self.workers = workers
+        self.batch_size = batch_size
+
+    def scan(self, ship_symbols=None):
+        started = time.monotonic()
+        targets = self._plan_targets(ship_symbols or self.player.shipSymbols)
+        if not targets:
+            logger.warning("No marketplace waypoints found around the fleet.")
+            return {"markets": 0, "goods": 0, "failed": 0, "elapsed_seconds": 0.0}
+
+        markets, goods, failed, pending = 0, 0, 0, []
+        with ThreadPoolExecutor(
+            max_workers=self.workers, thread_name_prefix="market"
+        ) as executor:
+            futures = {
+                executor.submit(self.player.fetch_market_data, symbol): symbol
+                for symbol in targets
+            }
+            for future in as_completed(futures):
+                symbol = futures[future]
+                ship_id, waypoint_id = targets[symbol]
+                try:
+                    market_data = future.result()
+                except Exception as e:
+                    market_data = None
+                    logger.error(f"Exception fetching market data for {symbol}: {e}")
+
+                if not market_data:
+                    logger.warning(f"Market data unavailable for {symbol}")
+                    failed += 1
+                    continue
+
+                pending.extend(
+                    self.market.market_goods_rows(market_data, ship_id, waypoint_id)
+                )
+                markets += 1
+                if markets % self.batch_size == 0:
+                    goods += self._commit(pending)
+                    pending = []
+
+        goods += self._commit(pending)
+        elapsed = time.monotonic() - started
+        logger.info(
+            f"Scanned {markets}/{len(targets)} markets ({goods} goods) in {elapsed:.1f}s"
+        )
+        return {
+            "markets": markets,
+            "goods": goods,
+            "failed": failed,
+            "elapsed_seconds": elapsed,
+        }
+
+    def _plan_targets(self, ship_symbols):
+        """Maps each marketplace waypoint in range to (ship_id, waypoint_id), first ship wins."""
+        with get_session() as session:
+            ships = (
+                session.query(Ship.id, Ship.symbol, Ship.systemSymbol)
+                .filter(Ship.symbol.in_(ship_symbols))
+                .all()
+            )
+
+        system_owner = {}
+        for ship_id, ship_symbol, system_symbol in ships:
+            neighbors = SolSystem(system_symbol).get_neighbors_within_radius(
+                radius=self.radius
+            )
+            for neighbor in neighbors:
+                system_owner.setdefault(neighbor["symbol"], ship_id)
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            marketplaces = dict(
+                zip(
+                    system_owner,
+                    executor.map(
+                        lambda system: cached_marketplaces(self.player, system),
+                        system_owner,
+                    ),
+                )
+            )
+
+        wanted = {
+            symbol: system_owner[system]
+            for system, symbols in marketplaces.items()
+            for symbol in symbols
+        }
+        if not wanted:
+            return {}
+
+        known = get_universe_catalog().waypoint_ids_for(wanted)
+        missing = set(wanted) - set(known)
+        if missing:
+            with get_session() as session:
+                rows = (
+                    session.query(Waypoint.id, Waypoint.waypoint_symbol)
+                    .filter(Waypoint.waypoint_symbol.in_(list(missing)))
+                    .all()
+                )
+            known.update({symbol: waypoint_id for waypoint_id, symbol in rows})
+        for symbol in set(wanted) - set(known):
+            logger.warning(f"Marketplace {symbol} is not in the waypoint table yet.")
+
+        return {
+            symbol: (ship_id, known[symbol])
+            for symbol, ship_id in wanted.items()
+            if symbol in known
+        }
+
+    @staticmethod
+    def _commit(rows):
+        if not rows:
+            return 0
+        with get_session() as session:
+            record_price_observations(session, rows)
+            stored = upsert_market_goods(session, rows)
+        markets_refreshed({row["waypoint_id"] for row in rows})
+        return stored
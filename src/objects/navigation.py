@@ -0,0 +1,44 @@
+import numpy as np
+
+# Travel rules of the SpaceTraders API, vectorised so whole distance matrices can be
+# converted to fuel / time estimates in one call. Every distance is taken to be a
+# trip between two different waypoints, which costs at least 1 fuel and 15 seconds
+# even at distance 0 (an orbital and its parent); zero_diagonal() clears the
+# origin == destination entries of an all-pairs matrix.
+FLIGHT_MODES = ("CRUISE", "DRIFT", "BURN", "STEALTH")
+SPEED_MULTIPLIER = {"CRUISE": 25.0, "DRIFT": 250.0, "BURN": 12.5, "STEALTH": 30.0}
+BASE_TRAVEL_SECONDS = 15
+
+
+def fuel_cost(distance, flight_mode="CRUISE"):
+    """Fuel burnt flying `distance` units (scalar or array) in the given flight mode."""
+    distance = np.asarray(distance, dtype=np.float64)
+    rounded = np.round(distance)
+    if flight_mode == "DRIFT":
+        cost = np.ones_like(rounded)
+    elif flight_mode == "BURN":
+        cost = np.maximum(2 * rounded, 2)
+    else:  # CRUISE and STEALTH
+        cost = np.maximum(rounded, 1)
+    cost = cost.astype(np.int64)
+    return cost if cost.ndim else int(cost)
+
+
+def travel_time(distance, engine_speed, flight_mode="CRUISE"):
+    """Seconds needed to fly `distance` units (scalar or array) at the engine's speed."""
+    distance = np.asarray(distance, dtype=np.float64)
+    speed = max(engine_speed or 1, 1)
+    seconds = np.round(
+        np.round(np.maximum(distance, 1))
+        * (SPEED_MULTIPLIER.get(flight_mode, SPEED_MULTIPLIER["CRUISE"]) / speed)
+        + BASE_TRAVEL_SECONDS
+    )
+    seconds = seconds.astype(np.int64)
+    return seconds if seconds.ndim else int(seconds)
+
+
+def zero_diagonal(matrix):
+    """Copy of a square all-pairs fuel/time matrix with staying put costing 0."""
+    matrix = np.array(matrix)
+    np.fill_diagonal(matrix, 0)
+    return matrix
@@ -1,13 +1,15 @@
 import requests
 from src.utils.config import BASE_URL, acc_token
 from src.utils.logger import logger
-from src.api.base_api import BaseAPI
+from src.api.async_base_api import AsyncBaseAPI
+from src.api.http_session import get_http_session, get_timeout
 from src.db.db_session import get_session
 from src.db.models import Agent, Ship
-from src.objects.ship import SpaceShip
+from src.db.ship_sync import sync_ships
+from src.objects.ship_state import invalidate_ship_state
 
 
-class Player(BaseAPI):
+class Player(AsyncBaseAPI):
     """Handles agent (player) actions in SpaceTraders."""
 
     # 1️⃣ Initialization & Dunder Methods
@@ -20,6 +22,7 @@ class Player(BaseAPI):
         self.credit = 0
         self.starting_faction = "UNKNOWN"
         self.shipSymbols = []
+        self.ship_payloads = []
         if load_from_db:
             self.load_from_db()
 
@@ -45,7 +48,9 @@ class Player(BaseAPI):
         data = {"symbol": symbol, "faction": faction}
 
         try:
-            response = requests.post(url, json=data, headers=headers)
+            response = get_http_session().post(
+                url, json=data, headers=headers, timeout=get_timeout()
+            )
             response.raise_for_status()
             response_data = response.json()
 
@@ -76,9 +81,24 @@ class Player(BaseAPI):
             logger.error(f"Failed to fetch agent info: {e}")
             return {}
 
+    async def fetch_agent_info_async(self):
+        """Async variant of fetch_agent_info()."""
+        response = await self._aget_request(f"{BASE_URL}/my/agent")
+        return response.get("data", {}) if response else {}
+
     def update_from_api(self):
         """Updates the player's current system, waypoint, and ships."""
         agent_info = self.fetch_agent_info()
+        if self._apply_agent_info(agent_info):
+            self._apply_ships(self.fetch_all_ships())
+
+    async def update_from_api_async(self):
+        """Async variant of update_from_api()."""
+        agent_info = await self.fetch_agent_info_async()
+        if self._apply_agent_info(agent_info):
+            self._apply_ships(await self.fetch_all_ships_async())
+
+    def _apply_agent_info(self, agent_info):
         headquarters = agent_info.get("headquarters", "")
 
         if headquarters:
@@ -86,12 +106,14 @@ class Player(BaseAPI):
             self.current_waypoint = headquarters
             self.credit = agent_info.get("credits", 0)
             self.starting_faction = agent_info.get("startingFaction", "UNKNOWN")
-            ships_data = self.view_my_ships()
-            self.shipSymbols = (
-                [x["symbol"] for x in ships_data.get("data", [])] if ships_data else []
-            )
-        else:
-            logger.warning("Player no longer exists !!")
+            return True
+
+        logger.warning("Player no longer exists !!")
+        return False
+
+    def _apply_ships(self, ships):
+        self.ship_payloads = ships or []
+        self.shipSymbols = [x["symbol"] for x in self.ship_payloads]
 
     def save_to_db(self):
         """Saves player data to the database."""
@@ -116,11 +138,29 @@ class Player(BaseAPI):
             session.flush()  # ensures agent.id is assigned
             logger.debug(f"Agent saved with ID: {agent.id}")
 
-            # Save each ship with agent.id
-            for shipSymbol in self.shipSymbols:
-                SpaceShip.load_or_create(
-                    player=self, shipSymbol=shipSymbol, session=session
-                )
+            # Every ship in one set-based write, from the pages already fetched
+            if self.ship_payloads or self.shipSymbols:
+                payloads = self.ship_payloads or self.fetch_all_ships() or []
+                sync_ships(session, agent.id, payloads)
+        invalidate_ship_state()
+
+    def sync_fleet(self):
+        """Pages /my/ships and writes the whole fleet in one transaction."""
+        ships = self.fetch_all_ships()
+        if ships is None:
+            return 0
+        self._apply_ships(ships)
+        with get_session() as session:
+            agent_id = (
+                session.query(Agent.id).filter_by(agent_token=self.agent_token).scalar()
+            )
+            if agent_id is None:
+                logger.warning("Cannot sync fleet: player not found in database.")
+                return 0
+            sync_ships(session, agent_id, ships)
+        invalidate_ship_state()
+        logger.info(f"Synced {len(ships)} ships.")
+        return len(ships)
 
     def load_from_db(self):
         """Loads player data from the database."""
@@ -165,19 +205,45 @@ class Player(BaseAPI):
         url = f"{BASE_URL}/systems"
         return self._get_request(url, params=params)
 
-    def fetch_waypoints(self, current_system=None, filter_by_trait=""):
+    def fetch_waypoints(
+        self, current_system=None, filter_by_trait="", page=1, limit=20
+    ):
         """Fetches waypoints in the player's current system, optionally filtering by trait."""
         current_system = current_system or self.current_system
         if not current_system:
             logger.error("Cannot fetch waypoints: Current system is unknown.")
             return None
 
-        query_params = f"?traits={filter_by_trait}" if filter_by_trait else ""
-        url = f"{BASE_URL}/systems/{current_system}/waypoints{query_params}"
-        return self._get_request(url, auth_req=False)
+        params = {"page": page, "limit": limit}
+        if filter_by_trait:
+            params["traits"] = filter_by_trait
+        url = f"{BASE_URL}/systems/{current_system}/waypoints"
+        return self._get_request(url, auth_req=False, params=params)
+
+    def fetch_all_waypoints(self, system_symbol, filter_by_trait="", limit=20):
+        """Pages through every waypoint of a system; returns None if any page fails."""
+        waypoints, page = [], 1
+        while True:
+            response = self.fetch_waypoints(system_symbol, filter_by_trait, page, limit)
+            if response is None:
+                return None
+            waypoints.extend(response.get("data", []))
+            total = response.get("meta", {}).get("total", 0)
+            if page * limit >= total:
+                return waypoints
+            page += 1
 
     def fetch_market_data(self, waypoint=None):
         """Fetches market data from a given system and waypoint."""
+        url = self._market_url(waypoint)
+        return self._get_request(url, auth_req=True) if url else None
+
+    async def fetch_market_data_async(self, waypoint=None):
+        """Async variant of fetch_market_data()."""
+        url = self._market_url(waypoint)
+        return await self._aget_request(url, auth_req=True) if url else None
+
+    def _market_url(self, waypoint=None):
         waypoint = waypoint or self.current_waypoint
 
         if not waypoint:
@@ -185,10 +251,47 @@ class Player(BaseAPI):
             return None
         system = "-".join(waypoint.split("-")[:2])
 
-        url = f"{BASE_URL}/systems/{system}/waypoints/{waypoint}/market"
-        return self._get_request(url, auth_req=True)
+        return f"{BASE_URL}/systems/{system}/waypoints/{waypoint}/market"
+
+    def fetch_jump_gate(self, waypoint):
+        """Fetches the connections of a jump gate waypoint."""
+        system = "-".join(waypoint.split("-")[:2])
+        return self._get_request(
+            f"{BASE_URL}/systems/{system}/waypoints/{waypoint}/jump-gate",
+            auth_req=True,
+        )
 
-    def view_my_ships(self):
-        """Fetches all player-owned ships."""
+    def view_my_ships(self, page=1, limit=20):
+        """Fetches one page of player-owned ships."""
         url = f"{BASE_URL}/my/ships"
-        return self._get_request(url)
+        return self._get_request(url, params={"page": page, "limit": limit})
+
+    async def view_my_ships_async(self, page=1, limit=20):
+        """Async variant of view_my_ships()."""
+        return await self._aget_request(
+            f"{BASE_URL}/my/ships", params={"page": page, "limit": limit}
+        )
+
+    def fetch_all_ships(self, limit=20):
+        """Pages through every player-owned ship; returns None if any page fails."""
+        ships, page = [], 1
+        while True:
+            response = self.view_my_ships(page, limit)
+            if response is None:
+                return None
+            ships.extend(response.get("data", []))
+            if page * limit >= response.get("meta", {}).get("total", 0):
+                return ships
+            page += 1
+
+    async def fetch_all_ships_async(self, limit=20):
+        """Async variant of fetch_all_ships()."""
+        ships, page = [], 1
+        while True:
+            response = await self.view_my_ships_async(page, limit)
+            if response is None:
+                return None
+            ships.extend(response.get("data", []))
+            if page * limit >= response.get("meta", {}).get("total", 0):
+                return ships
+            page += 1
@@ -0,0 +1,220 @@
+import heapq
+import threading
+import time
+from collections import OrderedDict
+import numpy as np
+from src.db.db_session import get_session
+from src.db.models import MarketTradeGoods, System, Waypoint
+from src.ml.fuel_predictor import get_fuel_predictor
+from src.objects.distance_matrix import get_distance_matrix
+from src.objects.navigation import (
+    FLIGHT_MODES,
+    fuel_cost,
+    travel_time,
+    zero_diagonal,
+)
+
+OBJECTIVES = ("fastest", "cheapest")
+MAX_PLANNERS = 64  # LRU bound; ships of one frame share a planner per system
+REFUEL_CACHE_TTL = 600  # seconds; fuel markets rarely change
+# Fuel dominates time in the "cheapest" objective; time only breaks ties.
+_FUEL_WEIGHT = 1_000_000
+
+
+class RoutePlanner:
+    """Plans multi-hop routes inside one system under a ship's fuel capacity.
+
+    The graph is the system's waypoints; a ship may only stop to refuel at refuel
+    capable waypoints, so intermediate hops always end at one of them. For every
+    pair of waypoints the best flight mode that fits the fuel budget is chosen
+    (fastest: least time, cheapest: least fuel). Edge weights from refuel stops are
+    precomputed once, so a query is a Dijkstra over a handful of nodes.
+    """
+
+    def __init__(
+        self,
+        matrix,
+        refuel_waypoints,
+        fuel_capacity,
+        engine_speed,
+        flight_modes=FLIGHT_MODES,
+        predictor=None,
+    ) -> None:
+        self.matrix = matrix
+        self.fuel_capacity = fuel_capacity
+        self.engine_speed = engine_speed
+        self.modes = tuple(flight_modes)
+        # A trained FuelPredictor replaces the static formulas when one is given.
+        fuel = predictor.predict_fuel if predictor else fuel_cost
+        time = predictor.predict_time if predictor else travel_time
+        self.fuel = np.stack(
+            [zero_diagonal(fuel(matrix.distances, m)) for m in self.modes]
+        )
+        self.time = np.stack(
+            [zero_diagonal(time(matrix.distances, engine_speed, m)) for m in self.modes]
+        )
+        self.refuel = np.array(
+            [s in refuel_waypoints for s in matrix.symbols], dtype=bool
+        )
+        self._stops = np.flatnonzero(self.refuel)
+        # Ships without a fuel tank (probes, solar) never run dry.
+        budget = np.inf if fuel_capacity <= 0 else fuel_capacity
+        self._static = {
+            objective: self._edges(np.full(len(matrix), budget), objective)
+            for objective in OBJECTIVES
+        }
+
+    def _edges(self, budget, objective):
+        """Returns (weight, mode index) matrices for leaving each row with budget[row] fuel."""
+        feasible = self.fuel <= budget[None, :, None]
+        if objective == "fastest":
+            cost = self.time.astype(np.float64)
+        else:
+            cost = self.fuel.astype(np.float64) * _FUEL_WEIGHT + self.time
+        cost = np.where(feasible, cost, np.inf)
+        mode = cost.argmin(axis=0)
+        return np.take_along_axis(cost, mode[None], axis=0)[0], mode
+
+    def plan(self, origin, destination, current_fuel, objective="fastest"):
+        """Returns the best route as a dict, or None if the destination is unreachable
+        or either end is not a waypoint of this system."""
+        if objective not in OBJECTIVES:
+            raise ValueError(f"Unknown objective {objective}; use one of {OBJECTIVES}.")
+        position = self.matrix.position
+        if origin not in position or destination not in position:
+            return None
+        o = self.matrix.index_of(origin)
+        d = self.matrix.index_of(destination)
+        if o == d:
+            return self._route(origin, destination, objective, [])
+
+        weights, modes = self._static[objective]
+        refuel_at_origin = bool(self.refuel[o])
+        if self.fuel_capacity > 0 and not refuel_at_origin:
+            budget = np.full(len(self.matrix), float(current_fuel))
+            origin_w, origin_m = self._edges(budget, objective)
+            origin_w, origin_m = origin_w[o], origin_m[o]
+        else:
+            origin_w, origin_m = weights[o], modes[o]
+
+        targets = np.union1d(self._stops, [d])
+        best = {o: 0.0}
+        previous = {}
+        heap = [(0.0, o)]
+        while heap:
+            cost, u = heapq.heappop(heap)
+            if u == d:
+                break
+            if cost > best.get(u, np.inf) or (u != o and not self.refuel[u]):
+                continue
+            row_w, row_m = (origin_w, origin_m) if u == o else (weights[u], modes[u])
+            for v in targets:
+                candidate = cost + row_w[v]
+                if v != u and candidate < best.get(v, np.inf):
+                    best[v] = candidate
+                    previous[v] = (u, row_m[v])
+                    heapq.heappush(heap, (candidate, v))
+
+        if d not in previous:
+            return None
+
+        hops = []
+        v = d
+        while v != o:
+            u, mode = previous[v]
+            hops.append((u, v, self.modes[mode]))
+            v = u
+        hops.reverse()
+        return self._route(origin, destination, objective, hops, refuel_at_origin)
+
+    def _route(self, origin, destination, objective, hops, refuel_at_origin=False):
+        legs = [
+            {
+                "from": self.matrix.symbols[u],
+                "to": self.matrix.symbols[v],
+                "flight_mode": mode,
+                "distance": float(self.matrix.distances[u, v]),
+                "fuel": int(self.fuel[self.modes.index(mode), u, v]),
+                "time": int(self.time[self.modes.index(mode), u, v]),
+                "refuel_after": bool(self.refuel[v] and v != hops[-1][1]),
+            }
+            for u, v, mode in hops
+        ]
+        return {
+            "origin": origin,
+            "destination": destination,
+            "objective": objective,
+            "refuel_at_origin": refuel_at_origin and self.fuel_capacity > 0,
+            "legs": legs,
+            "total_time": sum(leg["time"] for leg in legs),
+            "total_fuel": sum(leg["fuel"] for leg in legs),
+        }
+
+
+def refuel_waypoints(system_symbol):
+    """Waypoints of a system whose last seen market sells FUEL."""
+    with get_session() as session:
+        rows = (
+            session.query(Waypoint.waypoint_symbol)
+            .join(MarketTradeGoods, MarketTradeGoods.waypoint_id == Waypoint.id)
+            .join(System, Waypoint.system_id == System.id)
+            .filter(System.symbol == system_symbol)
+            .filter(MarketTradeGoods.product_symbol == "FUEL")
+            .distinct()
+            .all()
+        )
+    return frozenset(symbol for (symbol,) in rows)
+
+
+_lock = threading.Lock()
+_planners = OrderedDict()  # least recently used first
+_refuel = {}  # system symbol -> (expires_at, frozenset of refuel waypoints)
+
+
+def cached_refuel_waypoints(system_symbol, ttl=REFUEL_CACHE_TTL):
+    """refuel_waypoints() of a system, cached for `ttl` seconds."""
+    now = time.monotonic()
+    with _lock:
+        entry = _refuel.get(system_symbol)
+    if entry and entry[0] > now:
+        return entry[1]
+    waypoints = refuel_waypoints(system_symbol)
+    with _lock:
+        _refuel[system_symbol] = (now + ttl, waypoints)
+    return waypoints
+
+
+def get_route_planner(system_symbol, fuel_capacity, engine_speed, refuel=None):
+    """Returns a cached planner for (system, fuel capacity, engine speed, refuel stops).
+
+    Fuel and travel times come from the learned FuelPredictor; a retrained one
+    (new trained_at) yields new planners. Planners are rebuilt when their system's
+    distance matrix was invalidated, and at most MAX_PLANNERS are kept.
+    """
+    refuel = frozenset(
+        refuel if refuel is not None else cached_refuel_waypoints(system_symbol)
+    )
+    predictor = get_fuel_predictor()
+    matrix = get_distance_matrix(system_symbol)
+    key = (system_symbol, fuel_capacity, engine_speed, refuel, predictor.trained_at)
+    with _lock:
+        planner = _planners.get(key)
+        if planner is not None and planner.matrix is matrix:
+            _planners.move_to_end(key)
+            return planner
+
+    planner = RoutePlanner(
+        matrix, refuel, fuel_capacity, engine_speed, predictor=predictor
+    )
+    with _lock:
+        _planners[key] = planner
+        _planners.move_to_end(key)
+        while len(_planners) > MAX_PLANNERS:
+            _planners.popitem(last=False)
+    return planner
+
+
+def invalidate_route_planners():
+    with _lock:
+        _planners.clear()
+        _refuel.clear()
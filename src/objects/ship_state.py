@@ -0,0 +1,261 @@
+import copy
+import threading
+import time
+from sqlalchemy import event
+from src.db.db_session import get_session
+from src.db.models import (
+    Module,
+    Mount,
+    Ship,
+    ShipCargo,
+    ShipCooldown,
+    ShipCrew,
+    ShipEngine,
+    ShipFrame,
+    ShipFuel,
+    ShipNavigation,
+    ShipReactor,
+)
+
+DEFAULT_TTL = 30  # seconds
+
+
+def _iso(value):
+    return value.isoformat() if value else None
+
+
+# ORM row -> the dicts SpaceShip.fetch_*_from_db have always returned.
+def module_dict(ship_id, module):
+    return {
+        "id": module.id,
+        "ship_id": ship_id,
+        "name": module.name,
+        "symbol": module.symbol,
+        "power": module.power,
+        "crew": module.crew,
+        "slots": module.slots,
+        "capacity": module.capacity,
+    }
+
+
+def mount_dict(ship_id, mount):
+    return {
+        "id": mount.id,
+        "ship_id": ship_id,
+        "name": mount.name,
+        "symbol": mount.symbol,
+        "power": mount.power,
+        "crew": mount.crew,
+        "strength": mount.strength,
+    }
+
+
+def navigation_dict(ship_id, nav):
+    return {
+        "origin_waypoint": nav.origin_waypoint,
+        "origin_system": nav.origin_system,
+        "destination_waypoint": nav.destination_waypoint,
+        "destination_system": nav.destination_system,
+        "departure_time": _iso(nav.departure_time),
+        "arrival_time": _iso(nav.arrival_time),
+        "status": nav.status,
+        "flight_mode": nav.flightMode,
+    }
+
+
+def fuel_dict(ship_id, fuel):
+    return {
+        "ship_id": ship_id,
+        "current": fuel.current,
+        "capacity": fuel.capacity,
+        "consumed": fuel.consumed,
+        "last_updated": _iso(fuel.last_updated),
+    }
+
+
+def cargo_dict(ship_id, cargo):
+    return {
+        "ship_id": ship_id,
+        "current": cargo.current,
+        "capacity": cargo.capacity,
+        "inventory": cargo.inventory,
+        "last_updated": _iso(cargo.last_updated),
+    }
+
+
+def crew_dict(ship_id, crew):
+    return {
+        "ship_id": ship_id,
+        "current": crew.current,
+        "capacity": crew.capacity,
+        "required": crew.required,
+        "rotation": crew.rotation,
+        "morale": crew.morale,
+        "wages": crew.wages,
+        "last_updated": _iso(crew.last_updated),
+    }
+
+
+def frame_dict(ship_id, frame):
+    return {
+        "ship_id": ship_id,
+        "symbol": frame.symbol,
+        "name": frame.name,
+        "condition": frame.condition,
+        "integrity": frame.integrity,
+        "module_slots": frame.module_slots,
+        "mounting_points": frame.mounting_points,
+        "power_required": frame.power_required,
+        "crew_required": frame.crew_required,
+        "last_updated": _iso(frame.last_updated),
+    }
+
+
+def reactor_dict(ship_id, reactor):
+    return {
+        "ship_id": ship_id,
+        "symbol": reactor.symbol,
+        "name": reactor.name,
+        "condition": reactor.condition,
+        "integrity": reactor.integrity,
+        "power_output": reactor.power_output,
+        "crew_required": reactor.crew_required,
+        "quality": reactor.quality,
+        "last_updated": _iso(reactor.last_updated),
+    }
+
+
+def engine_dict(ship_id, engine):
+    return {
+        "ship_id": ship_id,
+        "symbol": engine.symbol,
+        "name": engine.name,
+        "condition": engine.condition,
+        "integrity": engine.integrity,
+        "speed": engine.speed,
+        "power_required": engine.power_required,
+        "crew_required": engine.crew_required,
+        "quality": engine.quality,
+        "last_updated": _iso(engine.last_updated),
+    }
+
+
+def cooldown_dict(ship_id, cooldown):
+    return {
+        "ship_id": ship_id,
+        "total_seconds": cooldown.total_seconds,
+        "remaining_seconds": cooldown.remaining_seconds,
+        "last_updated": _iso(cooldown.last_updated),
+    }
+
+
+# model -> (ShipState attribute, serializer), one row per ship
+PARTS = {
+    ShipNavigation: ("navigation", navigation_dict),
+    ShipFuel: ("fuel", fuel_dict),
+    ShipCargo: ("cargo", cargo_dict),
+    ShipCrew: ("crew", crew_dict),
+    ShipFrame: ("frame", frame_dict),
+    ShipReactor: ("reactor", reactor_dict),
+    ShipEngine: ("engine", engine_dict),
+    ShipCooldown: ("cooldown", cooldown_dict),
+}
+
+
+class ShipState:
+    """DB-side state of one ship as plain dicts, loaded together at `loaded_at`."""
+
+    def __init__(self, ship_id, parts, modules, mounts) -> None:
+        self.ship_id = ship_id
+        self.modules = modules
+        self.mounts = mounts
+        for name, _ in PARTS.values():
+            setattr(self, name, parts.get(name))
+        self.loaded_at = time.monotonic()
+
+    def age(self):
+        return time.monotonic() - self.loaded_at
+
+    def part(self, name):
+        """A copy of one part, so callers cannot mutate the cached state."""
+        return copy.deepcopy(getattr(self, name))
+
+    def as_dict(self):
+        return {
+            "ship_id": self.ship_id,
+            "modules": self.part("modules"),
+            "mounts": self.part("mounts"),
+            **{name: self.part(name) for name, _ in PARTS.values()},
+        }
+
+
+def load_ship_state(session, ship_symbol):
+    """Loads a ship, its components, modules and mounts in one outer-joined query.
+
+    Modules and mounts multiply the joined rows (modules x mounts, a handful per
+    ship); they are de-duplicated by id. Returns None if the ship is not in the DB.
+    """
+    models = list(PARTS)
+    query = session.query(Ship.id, *models, Module, Mount)
+    for model in models + [Module, Mount]:
+        query = query.outerjoin(model, model.ship_id == Ship.id)
+    rows = query.filter(Ship.symbol == ship_symbol).all()
+    if not rows:
+        return None
+
+    ship_id = rows[0][0]
+    parts, modules, mounts = {}, {}, {}
+    for _, *components, module, mount in rows:
+        for model, row in zip(models, components):
+            name, to_dict = PARTS[model]
+            if row is not None and name not in parts:
+                parts[name] = to_dict(ship_id, row)
+        if module is not None:
+            modules.setdefault(module.id, module_dict(ship_id, module))
+        if mount is not None:
+            mounts.setdefault(mount.id, mount_dict(ship_id, mount))
+    return ShipState(ship_id, parts, list(modules.values()), list(mounts.values()))
+
+
+_lock = threading.Lock()
+_states = {}
+_generation = 0  # bumped on invalidation so a load racing a write is not cached
+
+
+def get_ship_state(ship_symbol, ttl=DEFAULT_TTL):
+    """Cached ShipState of a ship, reloaded when older than `ttl` seconds."""
+    with _lock:
+        state = _states.get(ship_symbol)
+        generation = _generation
+    if state is not None and state.age() < ttl:
+        return state
+
+    with get_session() as session:
+        state = load_ship_state(session, ship_symbol)
+    if state is not None:
+        with _lock:
+            if _generation == generation:
+                _states[ship_symbol] = state
+    return state
+
+
+def invalidate_ship_state(ship_symbol=None):
+    """Drops the cached state of one ship, or of every ship."""
+    global _generation
+    with _lock:
+        if ship_symbol:
+            _states.pop(ship_symbol, None)
+        else:
+            _states.clear()
+        _generation += 1
+
+
+def invalidate_after_commit(session, ship_symbol=None):
+    """Invalidates once `session` commits: invalidating before the commit would let
+    a concurrent get_ship_state reload and cache the pre-commit rows."""
+    event.listen(
+        session,
+        "after_commit",
+        lambda _: invalidate_ship_state(ship_symbol),
+        once=True,
+    )
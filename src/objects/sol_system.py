@@ -1,31 +1,46 @@
 from typing import List, Dict, Union
 from src.db.db_session import get_session
 from src.db.models import System, Waypoint
-from geoalchemy2.functions import ST_DWithin, ST_Distance
+from geoalchemy2.functions import ST_DWithin, ST_Distance, ST_MakePoint
+from src.objects.spatial_index import current_spatial_index
+from src.objects.universe_catalog import get_universe_catalog
 
 
 class SolSystem:
     def __init__(self, sol_symbol: str):
         self.sol_symbol = sol_symbol
 
+    def _index(self):
+        index = current_spatial_index()
+        return index if index and index.has_system(self.sol_symbol) else None
+
+    def _reference(self, session):
+        """(id, location) of this system from the catalog, else from the DB, else None."""
+        system = get_universe_catalog().system(self.sol_symbol)
+        if system:
+            return system.id, ST_MakePoint(system.x, system.y)
+        system = session.query(System).filter(System.symbol == self.sol_symbol).first()
+        return (system.id, system.location) if system else None
+
     def get_n_neighbors(self, n: int = 10) -> List[Dict[str, Union[str, float]]]:
+        index = self._index()
+        if index:
+            return index.n_nearest_systems(self.sol_symbol, n)
+
         with get_session() as session:
-            reference_system = (
-                session.query(System).filter(System.symbol == self.sol_symbol).first()
-            )
+            reference = self._reference(session)
 
-            if not reference_system:
+            if not reference:
                 print(f"System '{self.sol_symbol}' not found.")
                 return []
 
+            reference_id, reference_location = reference
             closest_systems = (
                 session.query(
                     System,
-                    ST_Distance(System.location, reference_system.location).label(
-                        "distance"
-                    ),
+                    ST_Distance(System.location, reference_location).label("distance"),
                 )
-                .filter(System.id != reference_system.id)
+                .filter(System.id != reference_id)
                 .order_by("distance")
                 .limit(n)
                 .all()
@@ -36,6 +51,13 @@ class SolSystem:
             ]
 
     def distance_to(self, other_symbol: str) -> float:
+        index = self._index()
+        if index and index.has_system(other_symbol):
+            return index.system_distance(self.sol_symbol, other_symbol)
+        distance = get_universe_catalog().system_distance(self.sol_symbol, other_symbol)
+        if distance is not None:
+            return distance
+
         with get_session() as session:
             reference_system = (
                 session.query(System).filter(System.symbol == self.sol_symbol).first()
@@ -54,23 +76,24 @@ class SolSystem:
     def get_neighbors_within_radius(
         self, radius: float
     ) -> List[Dict[str, Union[str, float]]]:
+        index = self._index()
+        if index:
+            return index.systems_within_radius(self.sol_symbol, radius)
+
         with get_session() as session:
-            reference_system = (
-                session.query(System).filter(System.symbol == self.sol_symbol).first()
-            )
+            reference = self._reference(session)
 
-            if not reference_system:
+            if not reference:
                 print(f"System '{self.sol_symbol}' not found.")
                 return []
 
+            _, reference_location = reference
             neighbors = (
                 session.query(
                     System,
-                    ST_Distance(System.location, reference_system.location).label(
-                        "distance"
-                    ),
+                    ST_Distance(System.location, reference_location).label("distance"),
                 )
-                .filter(ST_DWithin(System.location, reference_system.location, radius))
+                .filter(ST_DWithin(System.location, reference_location, radius))
                 .order_by("distance")
                 .all()
             )
@@ -81,6 +104,13 @@ class SolSystem:
             ]
 
     def get_waypoints(self):
+        waypoints = get_universe_catalog().waypoints_of(self.sol_symbol)
+        if waypoints is not None:
+            return [
+                {"waypoint_symbol": wp.symbol, "waypoint_type": wp.type}
+                for wp in waypoints
+            ]
+
         with get_session() as session:
             # Get the system by symbol
             system = (
@@ -111,7 +141,30 @@ class SolWaypoints:
         self.waypoint_symbol = waypoint_symbol
         self.system_symbol = "-".join(self.waypoint_symbol.split("-")[:2])
 
+    def _orbitals_result(self, orbital_data):
+        if orbital_data:
+            return {
+                "status": "success",
+                "planet": self.waypoint_symbol,
+                "orbitals": orbital_data,
+            }
+        return {
+            "status": "success",
+            "planet": self.waypoint_symbol,
+            "message": f"No orbitals found for {self.waypoint_symbol}.",
+            "orbitals": [],
+        }
+
     def get_orbitals(self):
+        orbitals = get_universe_catalog().orbitals_of(self.waypoint_symbol)
+        if orbitals is not None:
+            return self._orbitals_result(
+                [
+                    {"waypoint_symbol": o.symbol, "waypoint_type": o.type}
+                    for o in orbitals
+                ]
+            )
+
         with get_session() as session:
             planet = (
                 session.query(Waypoint)
@@ -132,23 +185,12 @@ class SolWaypoints:
                 .all()
             )
 
-            if orbitals:
-                orbital_data = [
+            return self._orbitals_result(
+                [
                     {
                         "waypoint_symbol": o.waypoint_symbol,
                         "waypoint_type": o.waypoint_type,
                     }
                     for o in orbitals
                 ]
-                return {
-                    "status": "success",
-                    "planet": self.waypoint_symbol,
-                    "orbitals": orbital_data,
-                }
-            else:
-                return {
-                    "status": "success",
-                    "planet": self.waypoint_symbol,
-                    "message": f"No orbitals found for {self.waypoint_symbol}.",
-                    "orbitals": [],
-                }
+            )
@@ -0,0 +1,103 @@
+import threading
+import numpy as np
+from scipy.spatial import cKDTree
+from src.objects.universe_catalog import get_universe_catalog
+from src.utils.logger import logger
+
+
+class SpatialIndex:
+    """In-memory KD-tree over system coordinates, layered on the universe catalog.
+
+    Waypoint coordinates are local to their system, so waypoint queries only ever
+    compare waypoints of the same system and are answered straight from the
+    catalog's per-system slices.
+    """
+
+    def __init__(self, catalog) -> None:
+        self.catalog = catalog
+        self.system_symbols = np.char.decode(catalog.system_symbols).astype(object)
+        self.system_xy = np.asarray(catalog.system_xy, dtype=np.float64)
+        self.tree = cKDTree(self.system_xy) if len(self.system_xy) else None
+
+    @classmethod
+    def load_from_db(cls):
+        """Builds the index over the catalog (its snapshot, or the DB if there is none)."""
+        index = cls(get_universe_catalog())
+        logger.info(f"Spatial index loaded: {len(index.system_symbols)} systems.")
+        return index
+
+    def has_system(self, symbol):
+        return self.catalog.has_system(symbol)
+
+    def has_waypoint(self, symbol):
+        return self.catalog.has_waypoint(symbol)
+
+    def n_nearest_systems(self, symbol, n=10):
+        """k-NN over systems, excluding the system itself (like SolSystem.get_n_neighbors)."""
+        if self.tree is None or n <= 0:
+            return []
+        i = self.catalog.system_index(symbol)
+        k = min(n + 1, len(self.system_symbols))
+        distances, indices = self.tree.query(self.system_xy[i], k=k)
+        distances, indices = np.atleast_1d(distances), np.atleast_1d(indices)
+        return [
+            {"symbol": self.system_symbols[j], "distance": float(d)}
+            for d, j in zip(distances, indices)
+            if j != i
+        ][:n]
+
+    def systems_within_radius(self, symbol, radius):
+        """Systems within radius, including the system itself, sorted by distance."""
+        i = self.catalog.system_index(symbol)
+        indices = np.asarray(
+            self.tree.query_ball_point(self.system_xy[i], r=radius), dtype=np.int64
+        )
+        distances = np.hypot(*(self.system_xy[indices] - self.system_xy[i]).T)
+        order = np.argsort(distances, kind="stable")
+        return [
+            {"symbol": self.system_symbols[indices[j]], "distance": float(distances[j])}
+            for j in order
+        ]
+
+    def system_distance(self, a, b):
+        return self.catalog.system_distance(a, b)
+
+    def waypoint_distance(self, a, b):
+        return self.catalog.waypoint_distance(a, b)
+
+    def waypoints_of(self, system_symbol):
+        """Returns (symbols, xy) for the waypoints of one system (empty if unknown)."""
+        return self.catalog.waypoint_arrays(system_symbol) or ([], np.empty((0, 2)))
+
+
+_lock = threading.Lock()
+_index = None
+_enabled = False
+
+
+def enable_spatial_index(enabled=True):
+    """Turns on in-process answers for SolSystem neighbour/distance queries."""
+    global _enabled
+    _enabled = enabled
+
+
+def get_spatial_index():
+    """Returns the process-wide index, loading it from the database on first use."""
+    global _index
+    if _index is None:
+        with _lock:
+            if _index is None:
+                _index = SpatialIndex.load_from_db()
+    return _index
+
+
+def current_spatial_index():
+    """Returns the index if it is enabled, otherwise None (callers fall back to PostGIS)."""
+    return get_spatial_index() if _enabled else None
+
+
+def invalidate_spatial_index():
+    """Drops the cached index; the next query reloads it. Called after new systems are stored."""
+    global _index
+    with _lock:
+        _index = None
@@ -0,0 +1,288 @@
+import heapq
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import connected_components, dijkstra
+from scipy.spatial import cKDTree
+from geoalchemy2.functions import ST_X, ST_Y
+from src.db.bulk import replace_system_connections, upsert_system_connections
+from src.db.db_session import get_session
+from src.db.models import System, SystemConnection, Waypoint
+from src.objects.universe_catalog import current_universe_catalog
+from src.utils.logger import logger
+
+DEFAULT_WARP_RANGE = 800  # units; systems closer than this get a WARP edge
+JUMP_COST = 100  # cost of one jump in distance units (cooldown + antimatter)
+LANDMARKS = 16
+KINDS = ("WARP", "JUMP")
+
+
+def _system_coordinates(session):
+    catalog = current_universe_catalog()
+    if catalog is not None:
+        return catalog.system_ids.astype(np.int64), np.asarray(catalog.system_xy)
+    rows = session.query(System.id, ST_X(System.location), ST_Y(System.location)).all()
+    ids = np.array([r[0] for r in rows], dtype=np.int64)
+    xy = np.array([(r[1], r[2]) for r in rows], dtype=np.float64).reshape(-1, 2)
+    return ids, xy
+
+
+def rebuild_warp_edges(warp_range=DEFAULT_WARP_RANGE):
+    """Recomputes every WARP edge from System.location with one KD-tree pair query."""
+    with get_session() as session:
+        ids, xy = _system_coordinates(session)
+        if not len(ids):
+            return 0
+        pairs = cKDTree(xy).query_pairs(r=warp_range, output_type="ndarray")
+        distances = np.hypot(*(xy[pairs[:, 0]] - xy[pairs[:, 1]]).T)
+        stored = replace_system_connections(
+            session, "WARP", zip(ids[pairs[:, 0]], ids[pairs[:, 1]], distances)
+        )
+    logger.info(f"Stored {stored} warp edges (range {warp_range}).")
+    invalidate_system_graph()
+    return stored
+
+
+def sync_jump_gates(player, system_symbols=None, workers=8):
+    """Fetches jump gate connections for known gates and stores them as JUMP edges."""
+    with get_session() as session:
+        query = session.query(Waypoint.waypoint_symbol).filter(
+            Waypoint.waypoint_type == "JUMP_GATE"
+        )
+        if system_symbols is not None:
+            query = query.join(System, Waypoint.system_id == System.id).filter(
+                System.symbol.in_(list(system_symbols))
+            )
+        gates = [symbol for (symbol,) in query.all()]
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="gate") as pool:
+        responses = list(pool.map(player.fetch_jump_gate, gates))
+
+    links = set()
+    for gate, response in zip(gates, responses):
+        if not response:
+            logger.warning(f"Jump gate data unavailable for {gate}")
+            continue
+        for connection in response.get("data", {}).get("connections", []):
+            symbol = connection if isinstance(connection, str) else connection["symbol"]
+            links.add((_system_of(gate), _system_of(symbol)))
+
+    with get_session() as session:
+        systems = {s for link in links for s in link}
+        rows = (
+            session.query(
+                System.symbol, System.id, ST_X(System.location), ST_Y(System.location)
+            )
+            .filter(System.symbol.in_(list(systems)))
+            .all()
+        )
+        known = {symbol: (sid, x, y) for symbol, sid, x, y in rows}
+        edges = [
+            (
+                known[a][0],
+                known[b][0],
+                float(np.hypot(known[a][1] - known[b][1], known[a][2] - known[b][2])),
+            )
+            for a, b in links
+            if a in known and b in known
+        ]
+        stored = upsert_system_connections(session, "JUMP", edges)
+    logger.info(f"Stored {stored} jump gate edges from {len(gates)} gates.")
+    invalidate_system_graph()
+    return stored
+
+
+def _system_of(waypoint_symbol):
+    return "-".join(waypoint_symbol.split("-")[:2])
+
+
+class SystemGraph:
+    """Inter-system travel graph answering shortest-route queries with landmark A* (ALT).
+
+    Distances from a few far-apart landmark systems are precomputed with one sparse
+    Dijkstra each; by the triangle inequality they give an admissible lower bound,
+    so A* only expands the systems that can lie on a shortest route.
+    """
+
+    def __init__(
+        self,
+        symbols,
+        sources,
+        targets,
+        distances,
+        kinds,
+        jump_cost=JUMP_COST,
+        landmarks=LANDMARKS,
+    ) -> None:
+        self.symbols = np.asarray(symbols, dtype=object)
+        self.pos = {s: i for i, s in enumerate(self.symbols)}
+        n = len(self.symbols)
+
+        kinds = np.asarray(kinds, dtype=np.int8)
+        distances = np.asarray(distances, dtype=np.float64)
+        weights = np.where(kinds == KINDS.index("JUMP"), float(jump_cost), distances)
+
+        # Undirected: store both directions, keep the cheapest edge per ordered pair.
+        src = np.concatenate([sources, targets]).astype(np.int64)
+        dst = np.concatenate([targets, sources]).astype(np.int64)
+        weights = np.concatenate([weights, weights])
+        self._kind = np.concatenate([kinds, kinds])
+        self._distance = np.concatenate([distances, distances])
+        order = np.lexsort((weights, dst, src))
+        src, dst, weights = src[order], dst[order], weights[order]
+        keep = np.ones(len(src), dtype=bool)
+        keep[1:] = (src[1:] != src[:-1]) | (dst[1:] != dst[:-1])
+        src, dst, weights = src[keep], dst[keep], weights[keep]
+        self._kind = self._kind[order][keep]
+        self._distance = self._distance[order][keep]
+
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(src, minlength=n), out=indptr[1:])
+        self.graph = csr_matrix((weights, dst, indptr), shape=(n, n))
+        _, self.component = connected_components(self.graph, directed=False)
+        self.landmark_distances = self._landmarks(landmarks)
+
+    def _landmarks(self, count):
+        """Farthest-point landmark selection; returns a (landmarks, systems) distance array."""
+        n = self.graph.shape[0]
+        if n == 0 or count <= 0:
+            return np.zeros((0, n))
+        rows, current = [], int(np.argmax(np.diff(self.graph.indptr)))
+        closest = np.full(n, np.inf)
+        for _ in range(min(count, n)):
+            d = dijkstra(self.graph, directed=False, indices=current)
+            rows.append(d)
+            closest = np.minimum(closest, d)
+            candidates = np.where(np.isfinite(closest), closest, -1.0)
+            current = int(np.argmax(candidates))
+            if candidates[current] <= 0:
+                break
+        return np.vstack(rows)
+
+    @classmethod
+    def load_from_db(cls, **kwargs):
+        catalog = current_universe_catalog()
+        with get_session() as session:
+            if catalog is not None:
+                systems = zip(
+                    catalog.system_ids.tolist(),
+                    np.char.decode(catalog.system_symbols).tolist(),
+                )
+            else:
+                systems = session.query(System.id, System.symbol)
+            systems = list(systems)
+            edges = session.query(
+                SystemConnection.source_system_id,
+                SystemConnection.target_system_id,
+                SystemConnection.distance,
+                SystemConnection.kind,
+            ).all()
+
+            position = {sid: i for i, (sid, _) in enumerate(systems)}
+            known = [e for e in edges if e[0] in position and e[1] in position]
+            if catalog is not None and len(known) < len(edges):
+                # The mapped snapshot predates some systems; use the table instead.
+                systems = session.query(System.id, System.symbol).all()
+                position = {sid: i for i, (sid, _) in enumerate(systems)}
+                known = [e for e in edges if e[0] in position and e[1] in position]
+        if len(known) < len(edges):
+            logger.warning(
+                f"Skipping {len(edges) - len(known)} system connections "
+                f"to unknown systems."
+            )
+        edges = known
+
+        graph = cls(
+            [symbol for _, symbol in systems],
+            [position[a] for a, _, _, _ in edges],
+            [position[b] for _, b, _, _ in edges],
+            [d for _, _, d, _ in edges],
+            [KINDS.index(k) for _, _, _, k in edges],
+            **kwargs,
+        )
+        logger.info(f"System graph loaded: {len(systems)} systems, {len(edges)} edges.")
+        return graph
+
+    def _heuristic(self, nodes, target_distances):
+        d = self.landmark_distances[:, nodes]
+        bound = np.abs(target_distances[:, None] - d)
+        bound[~np.isfinite(bound)] = 0.0
+        return bound.max(axis=0) if len(bound) else np.zeros(len(nodes))
+
+    def shortest_path(self, source, target):
+        """Returns the cheapest route between two systems as a dict, or None if unreachable."""
+        if source not in self.pos or target not in self.pos:
+            return None  # not crawled yet
+        s, t = self.pos[source], self.pos[target]
+        if self.component[s] != self.component[t]:
+            return None
+
+        indptr, indices, data = self.graph.indptr, self.graph.indices, self.graph.data
+        target_distances = self.landmark_distances[:, t]
+        cost = {s: 0.0}
+        previous = {}
+        heap = [(self._heuristic([s], target_distances)[0], s)]
+        closed = set()
+        while heap:
+            _, u = heapq.heappop(heap)
+            if u == t:
+                break
+            if u in closed:
+                continue
+            closed.add(u)
+            start, end = indptr[u], indptr[u + 1]
+            neighbors = indices[start:end]
+            estimates = self._heuristic(neighbors, target_distances)
+            for edge, v, w, h in zip(
+                range(start, end), neighbors, data[start:end], estimates
+            ):
+                candidate = cost[u] + w
+                if candidate < cost.get(v, np.inf):
+                    cost[v] = candidate
+                    previous[v] = (u, edge)
+                    heapq.heappush(heap, (candidate + h, v))
+
+        if t not in cost:
+            return None
+
+        legs, v = [], t
+        while v != s:
+            u, edge = previous[v]
+            legs.append(
+                {
+                    "from": self.symbols[u],
+                    "to": self.symbols[v],
+                    "kind": KINDS[self._kind[edge]],
+                    "distance": float(self._distance[edge]),
+                }
+            )
+            v = u
+        legs.reverse()
+        return {
+            "origin": source,
+            "destination": target,
+            "systems": [source] + [leg["to"] for leg in legs],
+            "legs": legs,
+            "cost": float(cost[t]),
+        }
+
+
+_lock = threading.Lock()
+_graph = None
+
+
+def get_system_graph():
+    """Returns the process-wide system graph, loading it from the database on first use."""
+    global _graph
+    if _graph is None:
+        with _lock:
+            if _graph is None:
+                _graph = SystemGraph.load_from_db()
+    return _graph
+
+
+def invalidate_system_graph():
+    global _graph
+    with _lock:
+        _graph = None
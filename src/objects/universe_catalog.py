@@ -0,0 +1,431 @@
+import json
+import os
+import shutil
+import tempfile
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+import numpy as np
+from geoalchemy2.functions import ST_X, ST_Y
+from src.db.db_session import get_session
+from src.db.models import System, Waypoint
+from src.utils.logger import logger
+
+NO_PARENT = -1
+SNAPSHOT_DIR = Path(__file__).resolve().parent / "artifacts" / "universe"
+SNAPSHOT_VERSION = 1
+# Every column of a built catalog; a snapshot stores exactly these, one .npy each.
+ARRAYS = (
+    "system_symbols",
+    "system_ids",
+    "system_xy",
+    "system_by_id",
+    "sorted_system_ids",
+    "waypoint_symbols",
+    "waypoint_ids",
+    "waypoint_xy",
+    "type_names",
+    "waypoint_type",
+    "waypoint_by_id",
+    "sorted_waypoint_ids",
+    "waypoint_system",
+    "by_system",
+    "by_system_keys",
+    "waypoint_parent",
+    "children_order",
+    "children_parent",
+)
+
+
+class SystemRecord:
+    __slots__ = ("id", "symbol", "x", "y")
+
+    def __init__(self, id, symbol, x, y) -> None:
+        self.id = id
+        self.symbol = symbol
+        self.x = x
+        self.y = y
+
+    def __repr__(self):
+        return f"<SystemRecord(id={self.id}, symbol={self.symbol})>"
+
+
+class WaypointRecord:
+    __slots__ = ("id", "symbol", "type", "x", "y", "system_symbol", "parent_symbol")
+
+    def __init__(self, id, symbol, type, x, y, system_symbol, parent_symbol) -> None:
+        self.id = id
+        self.symbol = symbol
+        self.type = type
+        self.x = x
+        self.y = y
+        self.system_symbol = system_symbol
+        self.parent_symbol = parent_symbol
+
+    def __repr__(self):
+        return f"<WaypointRecord(id={self.id}, symbol={self.symbol})>"
+
+
+def _key(symbol):
+    return symbol.encode("ascii", "replace") if isinstance(symbol, str) else symbol
+
+
+def _find(sorted_values, value):
+    """Position of value in a sorted array, or None."""
+    i = int(np.searchsorted(sorted_values, value))
+    if i < len(sorted_values) and sorted_values[i] == value:
+        return i
+    return None
+
+
+def _group(keys, key):
+    """[start, end) of key in a sorted key array."""
+    return (
+        int(np.searchsorted(keys, key, side="left")),
+        int(np.searchsorted(keys, key, side="right")),
+    )
+
+
+def _ascii(values):
+    return np.char.encode(np.asarray(values, dtype=str), "ascii")
+
+
+class UniverseCatalog:
+    """Read-only copy of the systems and waypoints tables as flat NumPy columns.
+
+    Systems and waypoints are each sorted by symbol (stored as ASCII bytes), so a
+    lookup by symbol is a binary search. Ids, system membership, parents and
+    orbital children are int32 positions and sorted permutation arrays instead of
+    per-row dicts or ORM objects, which keeps a universe of hundreds of thousands
+    of waypoints at a few tens of MB.
+    """
+
+    def __init__(
+        self,
+        system_ids,
+        system_symbols,
+        system_xy,
+        waypoint_ids,
+        waypoint_symbols,
+        waypoint_types,
+        waypoint_xy,
+        waypoint_system_ids,
+        waypoint_parent_ids,
+    ) -> None:
+        system_symbols = _ascii(system_symbols)
+        order = np.argsort(system_symbols, kind="stable")
+        self.system_symbols = system_symbols[order]
+        self.system_ids = np.asarray(system_ids, dtype=np.int32)[order]
+        self.system_xy = np.asarray(system_xy, dtype=np.float64).reshape(-1, 2)[order]
+        self.system_by_id = np.argsort(self.system_ids, kind="stable").astype(np.int32)
+        self.sorted_system_ids = self.system_ids[self.system_by_id]
+
+        waypoint_symbols = _ascii(waypoint_symbols)
+        order = np.argsort(waypoint_symbols, kind="stable")
+        self.waypoint_symbols = waypoint_symbols[order]
+        self.waypoint_ids = np.asarray(waypoint_ids, dtype=np.int32)[order]
+        self.waypoint_xy = np.asarray(waypoint_xy, dtype=np.float64).reshape(-1, 2)[
+            order
+        ]
+        type_names, type_codes = np.unique(
+            np.asarray(waypoint_types, dtype=str), return_inverse=True
+        )
+        self.type_names = _ascii(type_names)
+        self.waypoint_type = type_codes.astype(np.int16)[order]
+        self.waypoint_by_id = np.argsort(self.waypoint_ids, kind="stable").astype(
+            np.int32
+        )
+        self.sorted_waypoint_ids = self.waypoint_ids[self.waypoint_by_id]
+
+        self.waypoint_system = self._system_positions(
+            np.asarray(waypoint_system_ids, dtype=np.int64)[order]
+        )
+        self.by_system = np.argsort(self.waypoint_system, kind="stable").astype(
+            np.int32
+        )
+        self.by_system_keys = self.waypoint_system[self.by_system]
+
+        parent_ids = np.asarray(waypoint_parent_ids, dtype=np.float64)[order]
+        self.waypoint_parent = np.full(len(self.waypoint_ids), NO_PARENT, np.int32)
+        has_parent = ~np.isnan(parent_ids)
+        self.waypoint_parent[has_parent] = self._waypoint_positions(
+            parent_ids[has_parent].astype(np.int64)
+        )
+        self.children_order = np.argsort(self.waypoint_parent, kind="stable").astype(
+            np.int32
+        )
+        self.children_parent = self.waypoint_parent[self.children_order]
+
+    def _system_positions(self, ids):
+        if not len(self.system_ids):
+            return np.zeros(len(ids), dtype=np.int32)
+        pos = np.searchsorted(self.sorted_system_ids, ids)
+        return self.system_by_id[np.minimum(pos, len(self.system_ids) - 1)]
+
+    def _waypoint_positions(self, ids):
+        pos = np.searchsorted(self.sorted_waypoint_ids, ids)
+        pos = np.minimum(pos, len(self.sorted_waypoint_ids) - 1)
+        found = self.sorted_waypoint_ids[pos] == ids
+        return np.where(found, self.waypoint_by_id[pos], NO_PARENT)
+
+    @classmethod
+    def load_from_db(cls):
+        """Two column queries; no ORM entities (and no joined Waypoint.system load)."""
+        with get_session() as session:
+            systems = session.query(
+                System.id, System.symbol, ST_X(System.location), ST_Y(System.location)
+            ).all()
+            waypoints = session.query(
+                Waypoint.id,
+                Waypoint.waypoint_symbol,
+                Waypoint.waypoint_type,
+                ST_X(Waypoint.waypoint_location),
+                ST_Y(Waypoint.waypoint_location),
+                Waypoint.system_id,
+                Waypoint.parent_waypoint_id,
+            ).all()
+
+        columns = list(zip(*waypoints)) or [()] * 7
+        catalog = cls(
+            [s[0] for s in systems],
+            [s[1] for s in systems],
+            [(s[2], s[3]) for s in systems],
+            columns[0],
+            columns[1],
+            columns[2],
+            list(zip(columns[3], columns[4])),
+            columns[5],
+            [np.nan if p is None else p for p in columns[6]],
+        )
+        logger.info(
+            f"Universe catalog loaded: {len(systems)} systems, {len(waypoints)} waypoints."
+        )
+        return catalog
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        """Wraps already-built columns (e.g. memory-mapped ones) without re-sorting."""
+        catalog = cls.__new__(cls)
+        for name in ARRAYS:
+            setattr(catalog, name, arrays[name])
+        return catalog
+
+    def save_snapshot(self, directory=SNAPSHOT_DIR):
+        """Writes every column as .npy into a fresh folder, then atomically points
+        CURRENT at it, so readers never see a half-written snapshot."""
+        directory.mkdir(parents=True, exist_ok=True)
+        target = Path(tempfile.mkdtemp(prefix="catalog-", dir=directory))
+        for name in ARRAYS:
+            np.save(target / f"{name}.npy", getattr(self, name), allow_pickle=False)
+        meta = {
+            "version": SNAPSHOT_VERSION,
+            "systems": len(self.system_ids),
+            "waypoints": len(self.waypoint_ids),
+            "created_at": datetime.now(timezone.utc).isoformat(),
+        }
+        (target / "meta.json").write_text(json.dumps(meta))
+        pointer = directory / f"CURRENT.{target.name}"
+        pointer.write_text(target.name)
+        os.replace(pointer, directory / "CURRENT")
+
+        # Older folders may still be mapped by running processes; on POSIX their
+        # pages stay valid after unlinking.
+        for old in directory.glob("catalog-*"):
+            if old != target:
+                shutil.rmtree(old, ignore_errors=True)
+        logger.info(f"Universe snapshot written to {target}.")
+        return target
+
+    @classmethod
+    def load_snapshot(cls, directory=SNAPSHOT_DIR):
+        """Memory-maps the current snapshot; None if missing, incompatible or empty."""
+        try:
+            target = directory / (directory / "CURRENT").read_text().strip()
+            meta = json.loads((target / "meta.json").read_text())
+            if meta.get("version") != SNAPSHOT_VERSION or not meta.get("systems"):
+                return None
+            arrays = {
+                name: np.load(target / f"{name}.npy", mmap_mode="r", allow_pickle=False)
+                for name in ARRAYS
+            }
+        except (OSError, ValueError):
+            return None
+        logger.info(
+            f"Universe snapshot mapped: {meta['systems']} systems, "
+            f"{meta['waypoints']} waypoints."
+        )
+        return cls.from_arrays(arrays)
+
+    # Lookups by symbol / id
+    def system_index(self, symbol):
+        return _find(self.system_symbols, _key(symbol))
+
+    def system_index_by_id(self, system_id):
+        i = _find(self.sorted_system_ids, system_id)
+        return None if i is None else int(self.system_by_id[i])
+
+    def waypoint_index(self, symbol):
+        return _find(self.waypoint_symbols, _key(symbol))
+
+    def waypoint_index_by_id(self, waypoint_id):
+        i = _find(self.sorted_waypoint_ids, waypoint_id)
+        return None if i is None else int(self.waypoint_by_id[i])
+
+    def has_system(self, symbol):
+        return self.system_index(symbol) is not None
+
+    def has_waypoint(self, symbol):
+        return self.waypoint_index(symbol) is not None
+
+    def _system_record(self, i):
+        x, y = self.system_xy[i]
+        return SystemRecord(
+            int(self.system_ids[i]), self.system_symbols[i].decode(), float(x), float(y)
+        )
+
+    def _waypoint_record(self, i):
+        x, y = self.waypoint_xy[i]
+        parent = self.waypoint_parent[i]
+        return WaypointRecord(
+            int(self.waypoint_ids[i]),
+            self.waypoint_symbols[i].decode(),
+            self.type_names[self.waypoint_type[i]].decode(),
+            float(x),
+            float(y),
+            self.system_symbols[self.waypoint_system[i]].decode(),
+            None if parent == NO_PARENT else self.waypoint_symbols[parent].decode(),
+        )
+
+    def system(self, symbol=None, system_id=None):
+        """SystemRecord by symbol or id, or None."""
+        i = (
+            self.system_index(symbol)
+            if symbol is not None
+            else self.system_index_by_id(system_id)
+        )
+        return None if i is None else self._system_record(i)
+
+    def waypoint(self, symbol=None, waypoint_id=None):
+        """WaypointRecord by symbol or id, or None."""
+        i = (
+            self.waypoint_index(symbol)
+            if symbol is not None
+            else self.waypoint_index_by_id(waypoint_id)
+        )
+        return None if i is None else self._waypoint_record(i)
+
+    def waypoint_ids_for(self, symbols):
+        """{symbol: waypoint id} for the symbols present in the catalog."""
+        ids = {}
+        for symbol in symbols:
+            i = self.waypoint_index(symbol)
+            if i is not None:
+                ids[symbol] = int(self.waypoint_ids[i])
+        return ids
+
+    # Hierarchy
+    def waypoints_of(self, system_symbol):
+        """WaypointRecords of one system (a contiguous slice), or None if unknown."""
+        s = self.system_index(system_symbol)
+        if s is None:
+            return None
+        start, end = _group(self.by_system_keys, s)
+        return [self._waypoint_record(i) for i in self.by_system[start:end]]
+
+    def waypoint_arrays(self, system_symbol):
+        """(symbols, xy) of one system's waypoints sorted by symbol, or None if unknown."""
+        s = self.system_index(system_symbol)
+        if s is None:
+            return None
+        start, end = _group(self.by_system_keys, s)
+        rows = self.by_system[start:end]
+        return (
+            np.char.decode(self.waypoint_symbols[rows]).tolist(),
+            self.waypoint_xy[rows],
+        )
+
+    def orbitals_of(self, waypoint_symbol):
+        """WaypointRecords orbiting a waypoint, or None if the waypoint is unknown."""
+        w = self.waypoint_index(waypoint_symbol)
+        if w is None:
+            return None
+        start, end = _group(self.children_parent, w)
+        return [self._waypoint_record(i) for i in self.children_order[start:end]]
+
+    # Geometry (waypoint coordinates are local to their system)
+    def system_distance(self, a, b):
+        pa, pb = self.system_index(a), self.system_index(b)
+        if pa is None or pb is None:
+            return None
+        return float(np.hypot(*(self.system_xy[pa] - self.system_xy[pb])))
+
+    def waypoint_distance(self, a, b):
+        pa, pb = self.waypoint_index(a), self.waypoint_index(b)
+        if pa is None or pb is None:
+            return None
+        return float(np.hypot(*(self.waypoint_xy[pa] - self.waypoint_xy[pb])))
+
+
+_lock = threading.Lock()
+_catalog = None
+
+
+def _save(catalog):
+    if not len(catalog.system_ids):
+        return  # nothing crawled yet; other processes should not map an empty universe
+    try:
+        catalog.save_snapshot()
+    except OSError as e:
+        logger.warning(f"Could not write universe snapshot: {e}")
+
+
+def get_universe_catalog():
+    """Returns the process-wide catalog: the mapped snapshot if there is one,
+    otherwise loaded from the DB (and snapshotted for the next process)."""
+    global _catalog
+    if _catalog is None:
+        with _lock:
+            if _catalog is None:
+                catalog = UniverseCatalog.load_snapshot()
+                if catalog is None:
+                    catalog = UniverseCatalog.load_from_db()
+                    _save(catalog)
+                _catalog = catalog
+    return _catalog
+
+
+def current_universe_catalog():
+    """The catalog if it is in memory or a snapshot can be mapped, else None.
+
+    Never queries the DB, for callers that only need one system and have a cheaper
+    query of their own.
+    """
+    global _catalog
+    if _catalog is None:
+        catalog = UniverseCatalog.load_snapshot()
+        with _lock:
+            if _catalog is None:
+                _catalog = catalog
+    return _catalog
+
+
+def rebuild_universe_snapshot():
+    """Reloads the catalog from the DB and replaces the snapshot (after a crawl)."""
+    global _catalog
+    catalog = UniverseCatalog.load_from_db()
+    _save(catalog)
+    with _lock:
+        _catalog = catalog
+    return catalog
+
+
+def invalidate_universe_catalog():
+    """Drops the cached catalog and the snapshot pointer; the next lookup reloads
+    from the DB. Called after systems are stored."""
+    global _catalog
+    with _lock:
+        _catalog = None
+        try:
+            (SNAPSHOT_DIR / "CURRENT").unlink(missing_ok=True)
+        except OSError as e:
+            logger.warning(f"Could not drop universe snapshot: {e}")
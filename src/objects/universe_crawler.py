@@ -0,0 +1,118 @@
+import math
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from src.utils.logger import logger
+
+MAX_PAGE_LIMIT = 20  # largest page size accepted by /systems
+
+
+class UniverseCrawler:
+    """Fetches /systems pages concurrently and streams them to a single DB writer.
+
+    Worker threads fetch pages (paced by the agent's shared rate limiter) and push them
+    onto a bounded queue; the calling thread drains the queue and writes each page, so
+    network and database work overlap while memory stays bounded.
+    """
+
+    def __init__(
+        self, fetch_page, store_page, limit=MAX_PAGE_LIMIT, workers=4, queue_size=8
+    ):
+        self.fetch_page = fetch_page
+        self.store_page = store_page
+        self.limit = min(limit, MAX_PAGE_LIMIT)
+        self.workers = workers
+        self.queue_size = queue_size
+
+    def crawl(self, pages=None):
+        """Crawls the given pages (all pages by default) and returns crawl statistics.
+
+        `pages` may also be a callable taking (total_pages, total_systems) that decides
+        which pages to fetch once the first page has revealed the size of the universe.
+        """
+        started = time.monotonic()
+        first = self._fetch(1)
+        if first is None:
+            logger.error("API failed on first page. Aborting crawl.")
+            return self._stats(0, 0, [1], 0, started)
+
+        total = first.get("meta", {}).get("total", 0)
+        max_pages = math.ceil(total / self.limit) if total > 0 else 1
+        if callable(pages):
+            pages = pages(max_pages, total)
+        pages = sorted(pages) if pages is not None else range(1, max_pages + 1)
+        pending = [page for page in pages if page != 1]
+
+        results = queue.Queue(maxsize=self.queue_size)
+        stop = threading.Event()
+        if 1 in pages:
+            results.put((1, first))
+
+        def worker(page):
+            if stop.is_set():
+                return
+            try:
+                data = self._fetch(page)
+            except Exception as e:
+                logger.error(f"Failed to fetch page {page}: {e}")
+                data = None
+            while not stop.is_set():
+                try:
+                    results.put((page, data), timeout=0.5)
+                    return
+                except queue.Full:
+                    continue
+
+        expected = len(pending) + (1 if 1 in pages else 0)
+        stored, systems_stored, failed = 0, 0, []
+        executor = ThreadPoolExecutor(
+            max_workers=self.workers, thread_name_prefix="crawl"
+        )
+        try:
+            for page in pending:
+                executor.submit(worker, page)
+
+            for done in range(1, expected + 1):
+                page, data = results.get()
+                systems = data.get("data", []) if data else None
+                if not systems:
+                    logger.error(f"No systems received for page {page}.")
+                    failed.append(page)
+                    continue
+
+                self.store_page(page, systems)
+                stored += 1
+                systems_stored += len(systems)
+                elapsed = time.monotonic() - started
+                rate = stored / elapsed if elapsed else 0.0
+                eta = (expected - done) / rate if rate else float("inf")
+                logger.info(
+                    f"Stored page {page} ({done}/{expected}) - "
+                    f"{rate:.2f} pages/s, ETA {eta:.0f}s"
+                )
+        finally:
+            stop.set()
+            executor.shutdown(wait=True, cancel_futures=True)
+
+        return self._stats(max_pages, stored, failed, systems_stored, started)
+
+    def _fetch(self, page):
+        return self.fetch_page({"page": page, "limit": self.limit})
+
+    @staticmethod
+    def _stats(max_pages, stored, failed, systems, started):
+        elapsed = time.monotonic() - started
+        stats = {
+            "total_pages": max_pages,
+            "pages_stored": stored,
+            "failed_pages": sorted(failed),
+            "systems_stored": systems,
+            "elapsed_seconds": elapsed,
+            "pages_per_second": stored / elapsed if elapsed else 0.0,
+        }
+        logger.info(
+            f"Crawl finished: {stored}/{max_pages} pages, {systems} systems, "
+            f"{stats['pages_per_second']:.2f} pages/s, failed pages: {stats['failed_pages']}"
+        )
+        return stats
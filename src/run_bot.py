@@ -0,0 +1,17 @@
+import asyncio
+from src.bot.trading_bot import FleetScheduler
+from src.db.db_session import get_session
+from src.db.models import Agent
+from src.objects.player import Player
+
+with get_session() as session:
+    agent = session.query(Agent).filter_by(id=1).first()
+
+    if agent:
+        agent_token = agent.agent_token
+    else:
+        agent_token = None
+
+
+player = Player(agent_token=agent_token)
+asyncio.run(FleetScheduler(player).run())
@@ -0,0 +1,8 @@
+from src.ml.fuel_predictor import FuelPredictor, load_trips
+from src.ml.market_predictor import MarketPricePredictor, load_price_history
+
+# Retrain and overwrite the cached artifacts the bot loads on startup.
+market_predictor = MarketPricePredictor().fit(load_price_history())
+if market_predictor.trained:
+    market_predictor.save()
+FuelPredictor().fit(load_trips()).save()